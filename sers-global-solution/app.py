@@ -5,8 +5,6 @@ Sistema de Eficiência Energética e Sustentabilidade Corporativa
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import time
 import sys
@@ -18,10 +16,41 @@ sys.path.append(os.path.dirname(__file__))
 try:
     from data_analyzer import EnergyAnalyzer
     from solar_simulator import SolarSimulator
+    from pv_model import PVModel
+    from tariff_engine import TariffEngine
+    from carbon_engine import CarbonEngine
+    from dataset_store import DatasetStore
+    from live_feed import LiveFeed
+    from snapshot import dump_snapshot, load_snapshot
+    from charts import (build_hourly_consumption_figure, build_department_figure,
+                        build_scenarios_figure, build_scenarios_table, cached_figure,
+                        build_floor_department_figure, build_floor_timeline_figure)
+    from consumption_cube import ConsumptionCube
+    from portfolio import PortfolioResultStore, generate_portfolio
 except ImportError as e:
     st.error(f"Erro ao importar módulos: {e}")
     st.stop()
 
+# Conjunto simulado compartilhado: todas as sessões analisam o mesmo prédio
+MAX_ANALYSIS_DAYS = 30
+SIMULATION_SEED = 42
+
+# Atualização automática do painel ao vivo, em segundos
+LIVE_REFRESH_SECONDS = 5
+
+# Granularidades de tempo oferecidas no detalhamento por andar
+DRILLDOWN_GRAINS = {"Hora": 'h', "Dia": 'D', "Semana": 'W'}
+
+# Portfólios simulados oferecidos no modo portfólio e colunas exibidas na tabela paginada
+PORTFOLIO_SIZES = [1000, 10000, 50000]
+PORTFOLIO_COLUMNS = {
+    'site_id': "Site", 'state': "Estado", 'available_area': "Área (m²)",
+    'monthly_consumption': "Consumo Mensal (kWh)", 'installed_power': "Potência (kWp)",
+    'self_sufficiency': "Autossuficiência (%)", 'total_investment': "Investimento (R$)",
+    'payback_years': "Payback (anos)", 'roi_25_years': "ROI 25 anos (%)",
+    'classification': "Classificação"
+}
+
 def setup_page():
     """Configuração inicial da página Streamlit"""
     st.set_page_config(
@@ -295,8 +324,23 @@ def main():
     # Sidebar - Configurações
     st.sidebar.header("Configurações da Análise")
     
+    analysis_mode = st.sidebar.radio("Modo de Análise", options=["Site Individual", "Portfólio"], horizontal=True)
+    use_pv_model = st.sidebar.checkbox("Modelo Fotovoltaico Físico (temperatura e inversor)", value=False,
+                                       on_change=reset_portfolio_page)
+    solar_simulator.pv_model = load_pv_model() if use_pv_model else None
+    
+    if analysis_mode == "Portfólio":
+        portfolio_size = st.sidebar.selectbox("Sites no Portfólio", options=PORTFOLIO_SIZES, index=1,
+                                              format_func=lambda size: f"{size:,}".replace(',', '.'),
+                                              on_change=reset_portfolio_page)
+        display_portfolio(load_portfolio_store(portfolio_size, use_pv_model))
+        display_sidebar_info()
+        return
+    
     st.sidebar.subheader("Dados de Consumo")
-    analysis_days = st.sidebar.slider("Período de Análise (dias)", 1, 30, 7)
+    analysis_days = st.sidebar.slider("Período de Análise (dias)", 1, MAX_ANALYSIS_DAYS, 7)
+    interval_label = st.sidebar.selectbox("Intervalo de Medição", options=["60 min", "15 min"], index=0)
+    measurement_freq = 'h' if interval_label == "60 min" else '15min'
     
     st.sidebar.subheader("Simulação Solar")
     state = st.sidebar.selectbox(
@@ -307,13 +351,38 @@ def main():
     
     available_area = st.sidebar.slider("Área Disponível para Painéis (m²)", 20, 200, 50)
     
+    use_tou_tariff = st.sidebar.checkbox("Tarifa Horo-Sazonal (ponta/fora ponta)", value=False)
+    tariff = TariffEngine() if use_tou_tariff else None
+    
+    use_hourly_carbon = st.sidebar.checkbox("Fator de Emissão Horário (CO₂)", value=False)
+    carbon = load_carbon_engine() if use_hourly_carbon else None
+    
+    st.sidebar.subheader("Monitoramento")
+    use_live_feed = st.sidebar.checkbox("Medição ao Vivo", value=False)
+    live_feed = load_live_feed() if use_live_feed else None
+    
     # Botão de execução principal
     if st.sidebar.button("Executar Análise Completa"):
-        execute_analysis(analyzer, solar_simulator, analysis_days, state, available_area)
+        execute_analysis(analyzer, solar_simulator, analysis_days, state, available_area, tariff,
+                         measurement_freq, carbon)
+    
+    display_snapshot_controls()
+    
+    # A última análise da sessão (ou a restaurada de um snapshot) permanece visível entre interações
+    results = st.session_state.get('analysis_results')
+    if results is not None:
+        display_results_in_tabs(results['consumption_data'], results['consumption_insights'],
+                                results['recommendations'], results['solar_simulation'],
+                                results['classification'], results['scenarios'], live_feed)
     else:
         show_initial_screen()
+        if live_feed is not None:
+            display_live_monitor(live_feed)
     
-    # Informações na sidebar
+    display_sidebar_info()
+
+def display_sidebar_info():
+    """Informações sobre a solução na barra lateral"""
     st.sidebar.markdown("---")
     st.sidebar.markdown("""
     <div style='background-color: #e3f2fd; padding: 1.2rem; border-radius: 6px; border-left: 4px solid #2196f3;'>
@@ -328,6 +397,67 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+@st.cache_resource
+def load_carbon_engine():
+    """Carrega uma única vez por processo os fatores de emissão horários (SERS_EMISSION_FACTORS)"""
+    path = os.environ.get('SERS_EMISSION_FACTORS')
+    if path:
+        return CarbonEngine.from_file(path)
+    return CarbonEngine.synthetic()
+
+@st.cache_resource
+def load_dataset_store():
+    """Repositório de dados único por processo, compartilhado entre as sessões (SERS_DATASET_MEMORY_MB)"""
+    return DatasetStore()
+
+@st.cache_resource
+def load_live_feed():
+    """
+    Inicia uma única vez por processo o monitoramento ao vivo
+
+    Acompanha o arquivo de leituras indicado em SERS_LIVE_FEED; sem ele, um
+    medidor simulado alimenta a janela diretamente em memória, sem arquivo.
+    """
+    feed = LiveFeed(window_hours=24)
+    path = os.environ.get('SERS_LIVE_FEED')
+    if path:
+        return feed.start(feed.tail_file(path, from_start=False))
+    
+    return feed.start(feed.simulate(EnergyAnalyzer(), interval_seconds=1.0, seed=SIMULATION_SEED))
+
+@st.cache_resource
+def load_pv_model():
+    """Modelo fotovoltaico único por processo: os perfis anuais por estado ficam em cache"""
+    return PVModel()
+
+@st.cache_resource
+def load_portfolio_store(n_sites, use_pv_model=False):
+    """
+    Calcula e indexa uma única vez por processo os resultados do portfólio
+
+    Lê os sites do CSV indicado em SERS_PORTFOLIO (site_id, state, available_area,
+    monthly_consumption); sem ele, usa um portfólio simulado com n_sites sites.
+    """
+    solar_simulator = SolarSimulator(pv_model=load_pv_model() if use_pv_model else None)
+    path = os.environ.get('SERS_PORTFOLIO')
+    if path:
+        sites = pd.read_csv(path)
+    else:
+        sites = generate_portfolio(n_sites, list(solar_simulator.irradiation), seed=SIMULATION_SEED)
+    return PortfolioResultStore(solar_simulator.calculate_feasibility_batch(sites))
+
+def load_consumption_data(analyzer, analysis_days, measurement_freq):
+    """Visão sem cópia dos primeiros dias do conjunto compartilhado do prédio"""
+    store = load_dataset_store()
+    key = ('simulado', MAX_ANALYSIS_DAYS, measurement_freq, SIMULATION_SEED)
+    loader = lambda: analyzer.generate_consumption_data(MAX_ANALYSIS_DAYS, seed=SIMULATION_SEED,
+                                                        freq=measurement_freq)
+    
+    start = store.get(key, loader, columns=['timestamp'])['timestamp'].iloc[0]
+    data = store.get(key, loader, end=start + pd.Timedelta(days=analysis_days))
+    analyzer.data = data
+    return data
+
 def show_initial_screen():
     """Mostra tela inicial antes da análise"""
     st.markdown("""
@@ -372,39 +502,81 @@ def show_initial_screen():
         </div>
         """, unsafe_allow_html=True)
 
-def execute_analysis(analyzer, solar_simulator, analysis_days, state, available_area):
-    """Executa a análise completa e exibe resultados"""
+def execute_analysis(analyzer, solar_simulator, analysis_days, state, available_area, tariff=None,
+                     measurement_freq='h', carbon=None):
+    """Executa a análise completa e guarda os resultados na sessão"""
     with st.spinner("Processando dados e gerando insights..."):
         time.sleep(2)
         
         try:
             # 1. Geração e análise de dados de consumo
-            consumption_data = analyzer.generate_consumption_data(analysis_days)
+            consumption_data = load_consumption_data(analyzer, analysis_days, measurement_freq)
             consumption_insights = analyzer.analyze_consumption_patterns(consumption_data)
-            recommendations = analyzer.generate_recommendations(consumption_insights)
+            anomalies = analyzer.detect_anomalies(consumption_data)
+            recommendations = analyzer.generate_recommendations(consumption_insights, anomalies)
             
             # 2. Simulação de energia solar
+            simulation_options = {}
+            if tariff is not None:
+                simulation_options = {'consumption_data': consumption_data, 'tariff': tariff}
+            if carbon is not None:
+                simulation_options['carbon'] = carbon
+            
             solar_simulation = solar_simulator.calculate_feasibility(
-                consumption_insights['total_consumption'], state, available_area
+                consumption_insights['total_consumption'], state, available_area, **simulation_options
             )
             
             classification = solar_simulator.classify_feasibility(solar_simulation)
             
             # 3. Geração de cenários comparativos
             scenarios = solar_simulator.generate_comparative_scenarios(
-                consumption_insights['total_consumption'], state
+                consumption_insights['total_consumption'], state, **simulation_options
             )
             
         except Exception as e:
             st.error(f"Erro durante a análise: {e}")
             return
     
-    # Exibição dos resultados em abas
-    display_results_in_tabs(consumption_data, consumption_insights, recommendations, 
-                           solar_simulation, classification, scenarios)
+    # Resultados guardados na sessão e exibidos em abas pela função principal
+    st.session_state['analysis_results'] = {
+        'site': {'state': state, 'available_area': available_area, 'days': analysis_days,
+                 'measurement_freq': measurement_freq},
+        'consumption_data': consumption_data,
+        'consumption_insights': consumption_insights,
+        'recommendations': recommendations,
+        'solar_simulation': solar_simulation,
+        'classification': classification,
+        'scenarios': scenarios
+    }
+
+def display_snapshot_controls():
+    """Salva a análise atual ou restaura uma análise gravada (arquivo .sers)"""
+    st.sidebar.subheader("Snapshot da Análise")
+    
+    uploaded = st.sidebar.file_uploader("Restaurar Análise", type=['sers'])
+    if uploaded is not None and st.session_state.get('restored_snapshot') != uploaded.file_id:
+        try:
+            with load_snapshot(uploaded.getvalue()) as snapshot:
+                st.session_state['analysis_results'] = dict(snapshot)
+            st.session_state['restored_snapshot'] = uploaded.file_id
+        except ValueError as e:
+            st.sidebar.error(f"Snapshot inválido: {e}")
+    
+    results = st.session_state.get('analysis_results')
+    if results is not None:
+        # Serializa só quando a análise muda, não a cada rerun da página
+        cached = st.session_state.get('snapshot_bytes')
+        if cached is None or cached[0] is not results:
+            cached = st.session_state['snapshot_bytes'] = (results, dump_snapshot(results))
+        st.sidebar.download_button(
+            "Salvar Análise",
+            data=cached[1],
+            file_name=f"analise_{results['site']['state']}_{datetime.now():%Y%m%d_%H%M}.sers",
+            mime='application/octet-stream'
+        )
 
 def display_results_in_tabs(consumption_data, consumption_insights, recommendations, 
-                           solar_simulation, classification, scenarios):
+                           solar_simulation, classification, scenarios, live_feed=None):
     """Exibe os resultados da análise em abas organizadas"""
     
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -419,7 +591,7 @@ def display_results_in_tabs(consumption_data, consumption_insights, recommendati
         display_executive_summary(consumption_insights, solar_simulation, classification, recommendations)
     
     with tab2:
-        display_consumption_analysis(consumption_data, consumption_insights)
+        display_consumption_analysis(consumption_data, consumption_insights, live_feed)
     
     with tab3:
         display_solar_analysis(solar_simulation, classification)
@@ -520,8 +692,11 @@ def display_executive_summary(consumption_insights, solar_simulation, classifica
         </div>
         """, unsafe_allow_html=True)
 
-def display_consumption_analysis(consumption_data, consumption_insights):
+def display_consumption_analysis(consumption_data, consumption_insights, live_feed=None):
     """Exibe a análise de consumo na segunda aba"""
+    if live_feed is not None:
+        display_live_monitor(live_feed)
+    
     st.markdown('<h3 class="section-header p-color">Análise de Consumo Energético</h3>', unsafe_allow_html=True)
     
     # Métricas de consumo
@@ -563,6 +738,46 @@ def display_consumption_analysis(consumption_data, consumption_insights):
         </div>
         """, unsafe_allow_html=True)
     
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Demanda Máxima</div>
+            <div class="metric-value">{consumption_insights['peak_demand_kw']:,.1f}</div>
+            <div class="metric-unit">kW (maior intervalo)</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Fator de Carga</div>
+            <div class="metric-value">{consumption_insights['load_factor']:.2f}</div>
+            <div class="metric-unit">demanda média / máxima</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        average_demand = consumption_insights['peak_demand_kw'] * consumption_insights['load_factor']
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Demanda Média</div>
+            <div class="metric-value">{average_demand:,.1f}</div>
+            <div class="metric-unit">kW (período analisado)</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        highest_dept = consumption_insights['highest_consumption_dept']
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Demanda do Departamento</div>
+            <div class="metric-value">{consumption_insights['department_demand_kw'][highest_dept]:,.1f}</div>
+            <div class="metric-unit">kW médios ({highest_dept})</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
     # Gráficos de análise
     st.markdown("### Visualização de Dados")
     
@@ -570,42 +785,108 @@ def display_consumption_analysis(consumption_data, consumption_insights):
     
     with col1:
         # Gráfico de consumo por hora
-        hourly_consumption = consumption_data.groupby('hour')['consumption_kwh'].mean().reset_index()
-        fig_hour = px.line(
-            hourly_consumption, 
-            x='hour', 
-            y='consumption_kwh',
-            title="Consumo Médio por Hora do Dia",
-            labels={'hour': 'Hora do Dia', 'consumption_kwh': 'Consumo (kWh)'}
-        )
-        fig_hour.update_traces(line_color='#2c3e50', line_width=2)
-        fig_hour.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(color='#333333'),
-            xaxis=dict(gridcolor='#e0e0e0', showgrid=True),
-            yaxis=dict(gridcolor='#e0e0e0', showgrid=True)
-        )
-        fig_hour.add_vrect(x0=8, x1=18, fillcolor="#2c3e50", opacity=0.1, 
-                          annotation_text="Horário Comercial", annotation_position="top left")
+        fig_hour = cached_figure(build_hourly_consumption_figure, consumption_insights['hourly_consumption'])
         st.plotly_chart(fig_hour, use_container_width=True)
     
     with col2:
         # Gráfico de consumo por departamento
-        dept_consumption = consumption_data.groupby('department')['consumption_kwh'].sum().reset_index()
-        fig_dept = px.pie(
-            dept_consumption,
-            values='consumption_kwh',
-            names='department',
-            title="Distribuição do Consumo por Departamento",
-            color_discrete_sequence=['#2c3e50', '#34495e', '#7f8c8d', '#bdc3c7']
-        )
-        fig_dept.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(color='#333333')
-        )
+        fig_dept = cached_figure(build_department_figure, consumption_insights['department_totals'])
         st.plotly_chart(fig_dept, use_container_width=True)
+    
+    display_consumption_drilldown(consumption_data)
+
+@st.cache_resource(max_entries=32)
+def load_consumption_cube(consumption_data):
+    """Cubo de consumo calculado uma única vez para cada conjunto de dados"""
+    return ConsumptionCube(consumption_data)
+
+@st.fragment
+def display_consumption_drilldown(consumption_data):
+    """Detalhamento por andar e departamento, respondido pelo cubo sem reprocessar a análise"""
+    st.markdown("### Detalhamento por Andar e Departamento")
+    
+    cube = load_consumption_cube(consumption_data)
+    floors = [int(floor) for floor in cube.levels['floor']]
+    departments = list(cube.levels['department'])
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        grain_label = st.selectbox("Granularidade", options=list(DRILLDOWN_GRAINS), index=1, key='drilldown_grain')
+    
+    with col2:
+        selected_floors = st.multiselect("Andares", options=floors, default=floors, key='drilldown_floors')
+    
+    with col3:
+        selected_departments = st.multiselect("Departamentos", options=departments, default=departments,
+                                              key='drilldown_departments')
+    
+    if not selected_floors or not selected_departments:
+        st.info("Selecione ao menos um andar e um departamento.")
+        return
+    
+    filters = {'floor': selected_floors, 'department': selected_departments}
+    floor_department = cube.dice(filters, group_by=('floor', 'department'))
+    floor_timeline = cube.dice(filters, group_by=('floor',), time_grain=DRILLDOWN_GRAINS[grain_label])
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(build_floor_department_figure(floor_department), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(build_floor_timeline_figure(floor_timeline), use_container_width=True)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def display_live_monitor(live_feed):
+    """Painel ao vivo, atualizado a partir dos agregados da janela deslizante"""
+    st.markdown('<h3 class="section-header p-color">Medição ao Vivo (últimas 24h)</h3>', unsafe_allow_html=True)
+    
+    snapshot = live_feed.snapshot()
+    if not snapshot['window_readings']:
+        st.info("Aguardando leituras dos medidores...")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Última Leitura</div>
+            <div class="metric-value">{snapshot['last_consumption_kwh']:,.1f}</div>
+            <div class="metric-unit">kWh às {snapshot['last_timestamp']:%d/%m %H:%M}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Consumo na Janela</div>
+            <div class="metric-value">{snapshot['total_consumption']:,.0f}</div>
+            <div class="metric-unit">kWh ({snapshot['window_readings']} leituras)</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Demanda Máxima</div>
+            <div class="metric-value">{snapshot['peak_demand_kw']:,.1f}</div>
+            <div class="metric-unit">kW na janela</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">Desperdício Noturno</div>
+            <div class="metric-value">{snapshot['night_waste']}%</div>
+            <div class="metric-unit">0h-6h na janela</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    fig_live = cached_figure(build_hourly_consumption_figure, snapshot['hourly_consumption'])
+    st.plotly_chart(fig_live, use_container_width=True, key='live_hourly_consumption')
 
 def display_solar_analysis(solar_simulation, classification):
     """Exibe a análise de energia solar na terceira aba"""
@@ -678,7 +959,15 @@ def display_solar_analysis(solar_simulation, classification):
             <p style='color: #333333; margin-bottom: 0; line-height: 1.5;'><strong>ROI (25 anos):</strong> {solar_simulation['roi_25_years']}%</p>
         </div>
         """, unsafe_allow_html=True)
-    
+
+        if solar_simulation.get('tariff_model') == 'horo-sazonal':
+            st.markdown(f"""
+            <div style='background-color: #f8f9fa; padding: 1.5rem; border-radius: 6px; border: 1px solid #dee2e6; margin-top: 1rem;'>
+                <p style='color: #333333; margin-bottom: 0.8rem; line-height: 1.5;'><strong>Fatura Mensal Atual:</strong> R$ {solar_simulation['monthly_cost_before']:,.2f}</p>
+                <p style='color: #333333; margin-bottom: 0; line-height: 1.5;'><strong>Fatura Mensal com Solar:</strong> R$ {solar_simulation['monthly_cost_after']:,.2f}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
     with col2:
         st.markdown("#### Ambiental")
         st.markdown(f"""
@@ -726,51 +1015,11 @@ def display_scenarios_comparison(scenarios, solar_simulation):
     st.markdown('<h3 class="section-header p-color">Cenários Comparativos de Instalação</h3>', unsafe_allow_html=True)
     
     # Tabela comparativa
-    comparison_data = []
-    for scenario, data in scenarios.items():
-        comparison_data.append({
-            'Cenário': scenario.upper(),
-            'Área (m²)': data['available_area'],
-            'Potência (kWp)': data['installed_power'],
-            'Geração (kWh/mês)': data['monthly_generation'],
-            'Autossuficiência (%)': data['self_sufficiency'],
-            'Investimento (R$)': data['total_investment'],
-            'Payback (anos)': data['payback_years']
-        })
-    
-    df_comparison = pd.DataFrame(comparison_data)
+    df_comparison = pd.DataFrame(build_scenarios_table(scenarios))
     st.dataframe(df_comparison, use_container_width=True)
     
     # Gráfico comparativo
-    fig_comparison = go.Figure()
-    
-    fig_comparison.add_trace(go.Bar(
-        name='Investimento (R$ mil)',
-        x=[c.upper() for c in scenarios.keys()],
-        y=[dados['total_investment'] / 1000 for dados in scenarios.values()],
-        marker_color='#2c3e50'
-    ))
-    
-    fig_comparison.add_trace(go.Scatter(
-        name='Autossuficiência (%)',
-        x=[c.upper() for c in scenarios.keys()],
-        y=[dados['self_sufficiency'] for dados in scenarios.values()],
-        yaxis='y2',
-        mode='lines+markers',
-        line=dict(color='red', width=3),  # Mudei para vermelho
-        marker=dict(size=8, color='red')  # Mudei para vermelho
-    ))
-    
-    fig_comparison.update_layout(
-        title='Comparação entre Cenários - Investimento vs Autossuficiência',
-        xaxis=dict(title='Cenários', gridcolor='#e0e0e0', showgrid=True),
-        yaxis=dict(title='Investimento (R$ mil)', side='left', gridcolor='#e0e0e0', showgrid=True),
-        yaxis2=dict(title='Autossuficiência (%)', side='right', overlaying='y', gridcolor='#e0e0e0', showgrid=True),
-        legend=dict(x=0.1, y=1.1, orientation='h'),
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='#333333')
-    )
+    fig_comparison = cached_figure(build_scenarios_figure, scenarios)
     
     st.plotly_chart(fig_comparison, use_container_width=True)
     
@@ -786,5 +1035,83 @@ def display_scenarios_comparison(scenarios, solar_simulation):
     </div>
     """, unsafe_allow_html=True)
 
+def reset_portfolio_page():
+    """Volta à primeira página quando filtros, ordenação ou tamanho do portfólio mudam"""
+    st.session_state['portfolio_page'] = 1
+
+@st.fragment
+def display_portfolio(store):
+    """Resultados do portfólio filtrados, ordenados e paginados no servidor"""
+    st.markdown('<h3 class="section-header p-color">Viabilidade Solar do Portfólio</h3>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        states = st.multiselect("Estados", options=list(store.levels['state']), key='portfolio_states',
+                                on_change=reset_portfolio_page)
+    
+    with col2:
+        classifications = st.multiselect("Classificação", options=list(store.levels['classification']),
+                                         key='portfolio_classifications', on_change=reset_portfolio_page)
+    
+    with col3:
+        max_payback = st.slider("Payback Máximo (anos)", 1.0, 15.0, 15.0, step=0.5, key='portfolio_payback',
+                                on_change=reset_portfolio_page)
+    
+    # Filtros vazios aceitam todos os valores
+    filters = {}
+    if states:
+        filters['state'] = states
+    if classifications:
+        filters['classification'] = classifications
+    if max_payback < 15.0:
+        filters['payback_years'] = (None, max_payback)
+    
+    summary = store.summary(filters, columns=['installed_power', 'total_investment', 'payback_years'])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Sites", f"{summary['sites']:,}".replace(',', '.'))
+    
+    if summary['sites']:
+        with col2:
+            st.metric("Potência Total", f"{summary['installed_power']['sum'] / 1000:,.1f} MWp")
+        
+        with col3:
+            st.metric("Investimento Total", f"R$ {summary['total_investment']['sum'] / 1e6:,.1f} mi")
+        
+        with col4:
+            st.metric("Payback Médio", f"{summary['payback_years']['mean']:.1f} anos")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        sort_label = st.selectbox("Ordenar por", options=list(PORTFOLIO_COLUMNS.values()),
+                                  index=list(PORTFOLIO_COLUMNS).index('roi_25_years'), key='portfolio_sort',
+                                  on_change=reset_portfolio_page)
+    
+    with col2:
+        descending = st.toggle("Ordem decrescente", value=True, key='portfolio_descending',
+                               on_change=reset_portfolio_page)
+    
+    with col3:
+        page_size = st.selectbox("Linhas por página", options=[25, 50, 100], index=1, key='portfolio_page_size',
+                                 on_change=reset_portfolio_page)
+    
+    n_pages = max(-(-summary['sites'] // page_size), 1)
+    st.session_state.setdefault('portfolio_page', 1)
+    page = st.number_input("Página", min_value=1, max_value=n_pages, step=1, key='portfolio_page')
+    
+    # Apenas a página visível é materializada e enviada ao navegador
+    sort_by = list(PORTFOLIO_COLUMNS)[list(PORTFOLIO_COLUMNS.values()).index(sort_label)]
+    rows, total = store.page(sort_by, ascending=not descending, filters=filters, page=page - 1, page_size=page_size)
+    
+    st.dataframe(rows[list(PORTFOLIO_COLUMNS)].rename(columns=PORTFOLIO_COLUMNS),
+                 use_container_width=True, hide_index=True)
+    
+    first = (page - 1) * page_size + 1 if total else 0
+    st.caption(f"Exibindo {first}–{min(page * page_size, total)} de {total} sites (página {page} de {n_pages})")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+SERS Global Solution - Módulo de Contabilidade de Carbono Horária
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data_analyzer import month_segments
+
+# Diretório das conversões .csv -> .npy (nunca ao lado do arquivo do usuário)
+CACHE_DIR = os.environ.get('SERS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'sers'))
+
+
+class CarbonEngine:
+    """
+    Classe para cálculo de emissões evitadas com fator de emissão horário da rede
+    """
+
+    def __init__(self, factors, start, freq='h', path=None):
+        """
+        Inicializa o motor de carbono com uma série de fatores de emissão
+
+        Args:
+            factors (numpy.ndarray): Fatores de emissão em kgCO₂/kWh (pode ser memory-mapped)
+            start (str): Instante do primeiro fator
+            freq (str): Intervalo entre fatores consecutivos
+            path (str): Arquivo .npy de origem, quando carregado do disco
+        """
+        self.factors = factors
+        self.start = pd.Timestamp(start)
+        self.freq = freq
+        self.path = path
+        self._step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+
+    @classmethod
+    def from_file(cls, path, cache_dir=None):
+        """
+        Carrega a série de fatores de um arquivo local (.npy ou .csv)
+
+        O arquivo .npy é aberto como memory-map somente leitura, de modo que
+        processos que carregam o mesmo arquivo compartilham as mesmas páginas.
+        Um .csv (colunas timestamp e factor_kg_per_kwh) deve formar uma grade
+        regular, sem lacunas nem instantes repetidos; é convertido uma única vez
+        para .npy no diretório de cache, indexado pelo caminho, tamanho e data
+        de modificação do original, sem gravar nada ao lado dele.
+
+        Args:
+            path (str): Caminho do arquivo de fatores
+            cache_dir (str): Diretório das conversões de .csv (padrão: CACHE_DIR)
+
+        Returns:
+            CarbonEngine: Motor de carbono
+        """
+        extension = os.path.splitext(path)[1]
+        if extension == '.csv':
+            path = _cached_conversion(path, cache_dir or CACHE_DIR)
+        elif extension != '.npy':
+            raise ValueError(f"Formato de arquivo {extension} não suportado")
+
+        meta_path = os.path.splitext(path)[0] + '.json'
+        if not os.path.exists(meta_path):
+            raise ValueError(f"Metadados {meta_path} não encontrados")
+        with open(meta_path, encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+
+        factors = np.load(path, mmap_mode='r')
+        return cls(factors, meta['start'], meta['freq'], path=path)
+
+    @classmethod
+    def synthetic(cls, year=2025, mean_factor=0.5):
+        """
+        Gera um ano típico de fatores horários com variação sazonal e diária
+
+        O fator é maior no período seco (maior despacho térmico) e no início
+        da noite, e menor ao meio-dia; a média anual é igual a mean_factor.
+
+        Args:
+            year (int): Ano de referência
+            mean_factor (float): Fator médio anual em kgCO₂/kWh
+
+        Returns:
+            CarbonEngine: Motor de carbono
+        """
+        index = pd.date_range(f'{year}-01-01', f'{year + 1}-01-01', freq='h', inclusive='left')
+        day_of_year = index.dayofyear.to_numpy()
+        hour = index.hour.to_numpy()
+
+        seasonal = np.cos(2 * np.pi * (day_of_year - 250) / 365.25)
+        diurnal = np.cos(2 * np.pi * (hour - 19) / 24)
+        factors = mean_factor * (1 + 0.25 * seasonal + 0.15 * diurnal)
+        return cls(factors / factors.mean() * mean_factor, index[0])
+
+    def save(self, path):
+        """
+        Grava a série de fatores como .npy (com metadados .json) para uso compartilhado
+
+        Args:
+            path (str): Caminho do arquivo .npy
+        """
+        np.save(path, np.asarray(self.factors, dtype=np.float64))
+        with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as meta_file:
+            json.dump({'start': str(self.start), 'freq': self.freq}, meta_file)
+
+    def factors_for(self, timestamps, wrap=True):
+        """
+        Alinha os fatores de emissão aos instantes informados, sem laço em Python
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo
+            wrap (bool): Trata a série como ano típico e repete-a fora do seu período
+
+        Returns:
+            numpy.ndarray: Fator de emissão (kgCO₂/kWh) de cada instante
+        """
+        index = pd.DatetimeIndex(timestamps)
+        positions = ((index - self.start) // self._step).to_numpy(dtype=np.int64)
+
+        if wrap:
+            positions = np.mod(positions, len(self.factors))
+        elif positions.min() < 0 or positions.max() >= len(self.factors):
+            raise ValueError("Instantes fora do período coberto pelos fatores de emissão")
+
+        return np.asarray(self.factors)[positions]
+
+    def calculate_emissions(self, timestamps, energy_kwh):
+        """
+        Calcula emissões por intervalo, mês e ano para um ou vários sites
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo (comuns a todos os sites)
+            energy_kwh (array-like): Energia por intervalo, vetor (intervalos) ou
+                matriz (sites x intervalos)
+
+        Returns:
+            dict: Emissões em kgCO₂ por intervalo ('hourly'), por mês ('monthly',
+                com 'months') e por ano ('annual', com 'years')
+        """
+        index = pd.DatetimeIndex(timestamps)
+        energy_kwh = np.asarray(energy_kwh, dtype=float)
+        if energy_kwh.shape[-1] != len(index):
+            raise ValueError("Série de energia incompatível com os instantes informados")
+
+        if not index.is_monotonic_increasing:
+            order = np.argsort(index.to_numpy(), kind='stable')
+            index = index[order]
+            energy_kwh = energy_kwh[..., order]
+
+        hourly = energy_kwh * self.factors_for(index)
+
+        months, starts = month_segments(index)
+        monthly = np.add.reduceat(hourly, starts, axis=-1)
+
+        years = months.astype('datetime64[Y]')
+        year_starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        annual = np.add.reduceat(monthly, year_starts, axis=-1)
+
+        return {
+            'hourly': hourly,
+            'months': months,
+            'monthly': monthly,
+            'years': years[year_starts],
+            'annual': annual
+        }
+
+    def avoided_emissions(self, timestamps, generation, consumption=None):
+        """
+        Calcula as emissões evitadas pela geração solar
+
+        Sem consumo, toda a geração desloca energia da rede; com consumo, apenas
+        a parcela autoconsumida é contabilizada.
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo
+            generation (array-like): Geração por intervalo em kWh (intervalos ou sites x intervalos)
+            consumption (array-like): Consumo por intervalo em kWh, mesmo formato (opcional)
+
+        Returns:
+            dict: Emissões evitadas em kgCO₂ por intervalo, mês e ano
+        """
+        generation = np.asarray(generation, dtype=float)
+        if consumption is not None:
+            generation = np.minimum(generation, np.asarray(consumption, dtype=float))
+        return self.calculate_emissions(timestamps, generation)
+
+    def __reduce__(self):
+        # Séries carregadas do disco viajam entre processos apenas pelo caminho
+        if self.path is not None:
+            return (CarbonEngine.from_file, (self.path,))
+        return (CarbonEngine, (np.asarray(self.factors), str(self.start), self.freq))
+
+
+def _cached_conversion(csv_path, cache_dir):
+    """Converte o .csv para .npy no diretório de cache (se ainda não convertido) e retorna o .npy"""
+    stat = os.stat(csv_path)
+    key = f'{os.path.abspath(csv_path)}:{stat.st_size}:{stat.st_mtime_ns}'
+    npy_path = os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.npy')
+    if os.path.exists(npy_path):
+        return npy_path
+
+    series = pd.read_csv(csv_path, parse_dates=['timestamp']).sort_values('timestamp')
+    index = pd.DatetimeIndex(series['timestamp'])
+    freq = _grid_freq(index)
+
+    # Grava em arquivo temporário e renomeia: outro processo nunca lê uma conversão parcial
+    os.makedirs(cache_dir, exist_ok=True)
+    engine = CarbonEngine(series['factor_kg_per_kwh'].to_numpy(dtype=np.float64), index[0], freq)
+    handle, temporary = tempfile.mkstemp(suffix='.npy', dir=cache_dir)
+    os.close(handle)
+    try:
+        engine.save(temporary)
+        os.replace(os.path.splitext(temporary)[0] + '.json', os.path.splitext(npy_path)[0] + '.json')
+        os.replace(temporary, npy_path)
+    finally:
+        for leftover in (temporary, os.path.splitext(temporary)[0] + '.json'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return npy_path
+
+
+def _grid_freq(index):
+    """Intervalo de uma série de instantes em grade regular; ValueError se houver lacunas ou repetições"""
+    if len(index) < 2:
+        raise ValueError("Série de fatores deve ter ao menos dois instantes")
+    steps = np.diff(index.as_unit('s').asi8)
+    if (steps <= 0).any():
+        raise ValueError("Instantes dos fatores de emissão não podem se repetir")
+    if (steps != steps[0]).any():
+        gap = index[1:][steps != steps[0]][0]
+        raise ValueError(f"Série de fatores de emissão com intervalo irregular em {gap}")
+    return pd.tseries.frequencies.to_offset(pd.Timedelta(seconds=int(steps[0]))).freqstr
+
+
+if __name__ == "__main__":
+    engine = CarbonEngine.synthetic()
+    timestamps = pd.date_range('2025-01-01', periods=8760, freq='h')
+    hour = timestamps.hour.to_numpy()
+    profile = np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None)
+    sites = np.random.default_rng(0).uniform(5, 50, size=(1000, 1)) * profile
+
+    result = engine.avoided_emissions(timestamps, sites)
+    print("Emissões evitadas médias por site (tCO₂/ano):", round(result['annual'].mean() / 1000, 2))
@@ -0,0 +1,272 @@
+"""
+SERS Global Solution - Módulo de Construção de Gráficos
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Figuras prontas compartilhadas por todas as sessões, indexadas pela impressão digital dos dados
+FIGURE_CACHE_SIZE = 256
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def data_fingerprint(data):
+    """
+    Calcula a impressão digital dos agregados usados para construir uma figura
+
+    Args:
+        data (dict): Agregados (ex.: insights['hourly_consumption'] ou cenários)
+
+    Returns:
+        str: Hash hexadecimal do conteúdo
+    """
+    content = json.dumps(data, sort_keys=True, separators=(',', ':'),
+                         default=lambda value: value.item() if isinstance(value, np.generic) else str(value))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def cached_figure(builder, data):
+    """
+    Retorna a figura construída por builder, reaproveitando-a enquanto os dados não mudarem
+
+    A figura em cache não deve ser alterada por quem a recebe.
+
+    Args:
+        builder (callable): Função de construção (ex.: build_department_figure)
+        data (dict): Agregados passados ao builder
+
+    Returns:
+        plotly.graph_objects.Figure: Figura pronta
+    """
+    return _cache_entry(builder, data)['figure']
+
+
+def cached_figure_json(builder, data):
+    """
+    Retorna a figura de builder já serializada em JSON, reaproveitando-a enquanto os dados não mudarem
+
+    Args:
+        builder (callable): Função de construção (ex.: build_department_figure)
+        data (dict): Agregados passados ao builder
+
+    Returns:
+        str: Figura serializada (formato Plotly JSON)
+    """
+    entry = _cache_entry(builder, data)
+    if entry['json'] is None:
+        entry['json'] = entry['figure'].to_json()
+    return entry['json']
+
+
+def _cache_entry(builder, data):
+    """Busca ou constrói a entrada de cache (figura e JSON) de um builder e seus dados"""
+    key = (builder.__name__, data_fingerprint(data))
+    with _figure_cache_lock:
+        entry = _figure_cache.get(key)
+        if entry is not None:
+            _figure_cache.move_to_end(key)
+            return entry
+
+    entry = {'figure': builder(data), 'json': None}
+    with _figure_cache_lock:
+        _figure_cache[key] = entry
+        if len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return entry
+
+
+def build_hourly_consumption_figure(hourly_consumption):
+    """
+    Constrói o gráfico de consumo médio por hora do dia
+
+    Args:
+        hourly_consumption (dict): Consumo médio (kWh) por hora do dia, como em
+            insights['hourly_consumption']
+
+    Returns:
+        plotly.graph_objects.Figure: Gráfico de linha
+    """
+    hourly_consumption = pd.DataFrame({
+        'hour': list(hourly_consumption.keys()),
+        'consumption_kwh': list(hourly_consumption.values())
+    })
+    fig_hour = px.line(
+        hourly_consumption,
+        x='hour',
+        y='consumption_kwh',
+        title="Consumo Médio por Hora do Dia",
+        labels={'hour': 'Hora do Dia', 'consumption_kwh': 'Consumo (kWh)'}
+    )
+    fig_hour.update_traces(line_color='#2c3e50', line_width=2)
+    fig_hour.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='#333333'),
+        xaxis=dict(gridcolor='#e0e0e0', showgrid=True),
+        yaxis=dict(gridcolor='#e0e0e0', showgrid=True)
+    )
+    fig_hour.add_vrect(x0=8, x1=18, fillcolor="#2c3e50", opacity=0.1,
+                       annotation_text="Horário Comercial", annotation_position="top left")
+    return fig_hour
+
+
+def build_department_figure(department_totals):
+    """
+    Constrói o gráfico de distribuição do consumo por departamento
+
+    Args:
+        department_totals (dict): Consumo total (kWh) por departamento, como em
+            insights['department_totals']
+
+    Returns:
+        plotly.graph_objects.Figure: Gráfico de pizza
+    """
+    dept_consumption = pd.DataFrame({
+        'department': list(department_totals.keys()),
+        'consumption_kwh': list(department_totals.values())
+    })
+    fig_dept = px.pie(
+        dept_consumption,
+        values='consumption_kwh',
+        names='department',
+        title="Distribuição do Consumo por Departamento",
+        color_discrete_sequence=['#2c3e50', '#34495e', '#7f8c8d', '#bdc3c7']
+    )
+    fig_dept.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='#333333')
+    )
+    return fig_dept
+
+
+def build_scenarios_figure(scenarios):
+    """
+    Constrói o gráfico comparativo de investimento vs autossuficiência
+
+    Args:
+        scenarios (dict): Dicionário com múltiplos cenários
+
+    Returns:
+        plotly.graph_objects.Figure: Gráfico combinado de barras e linha
+    """
+    fig_comparison = go.Figure()
+
+    fig_comparison.add_trace(go.Bar(
+        name='Investimento (R$ mil)',
+        x=[c.upper() for c in scenarios.keys()],
+        y=[dados['total_investment'] / 1000 for dados in scenarios.values()],
+        marker_color='#2c3e50'
+    ))
+
+    fig_comparison.add_trace(go.Scatter(
+        name='Autossuficiência (%)',
+        x=[c.upper() for c in scenarios.keys()],
+        y=[dados['self_sufficiency'] for dados in scenarios.values()],
+        yaxis='y2',
+        mode='lines+markers',
+        line=dict(color='red', width=3),
+        marker=dict(size=8, color='red')
+    ))
+
+    fig_comparison.update_layout(
+        title='Comparação entre Cenários - Investimento vs Autossuficiência',
+        xaxis=dict(title='Cenários', gridcolor='#e0e0e0', showgrid=True),
+        yaxis=dict(title='Investimento (R$ mil)', side='left', gridcolor='#e0e0e0', showgrid=True),
+        yaxis2=dict(title='Autossuficiência (%)', side='right', overlaying='y', gridcolor='#e0e0e0', showgrid=True),
+        legend=dict(x=0.1, y=1.1, orientation='h'),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='#333333')
+    )
+    return fig_comparison
+
+
+def build_scenarios_table(scenarios):
+    """
+    Monta as linhas da tabela comparativa de cenários
+
+    Args:
+        scenarios (dict): Dicionário com múltiplos cenários
+
+    Returns:
+        list: Lista de dicionários, um por cenário
+    """
+    comparison_data = []
+    for scenario, data in scenarios.items():
+        comparison_data.append({
+            'Cenário': scenario.upper(),
+            'Área (m²)': data['available_area'],
+            'Potência (kWp)': data['installed_power'],
+            'Geração (kWh/mês)': data['monthly_generation'],
+            'Autossuficiência (%)': data['self_sufficiency'],
+            'Investimento (R$)': data['total_investment'],
+            'Payback (anos)': data['payback_years']
+        })
+    return comparison_data
+
+
+def build_floor_department_figure(floor_department):
+    """
+    Constrói o gráfico de consumo por andar, empilhado por departamento
+
+    Args:
+        floor_department (pandas.DataFrame): Consulta do cubo agrupada por 'floor' e
+            'department'
+
+    Returns:
+        plotly.graph_objects.Figure: Gráfico de barras empilhadas
+    """
+    fig_floor = px.bar(
+        floor_department.assign(floor=floor_department['floor'].astype(str) + 'º andar'),
+        x='floor',
+        y='consumption_kwh',
+        color='department',
+        title="Consumo por Andar e Departamento",
+        labels={'floor': 'Andar', 'consumption_kwh': 'Consumo (kWh)', 'department': 'Departamento'},
+        color_discrete_sequence=['#2c3e50', '#34495e', '#7f8c8d', '#bdc3c7']
+    )
+    fig_floor.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='#333333'),
+        yaxis=dict(gridcolor='#e0e0e0', showgrid=True)
+    )
+    return fig_floor
+
+
+def build_floor_timeline_figure(floor_timeline):
+    """
+    Constrói o gráfico da evolução do consumo de cada andar no tempo
+
+    Args:
+        floor_timeline (pandas.DataFrame): Consulta do cubo agrupada por 'floor' com
+            granularidade de tempo
+
+    Returns:
+        plotly.graph_objects.Figure: Gráfico de linhas
+    """
+    fig_timeline = px.line(
+        floor_timeline.assign(floor=floor_timeline['floor'].astype(str) + 'º andar'),
+        x='timestamp',
+        y='consumption_kwh',
+        color='floor',
+        title="Evolução do Consumo por Andar",
+        labels={'timestamp': 'Período', 'consumption_kwh': 'Consumo (kWh)', 'floor': 'Andar'}
+    )
+    fig_timeline.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color='#333333'),
+        xaxis=dict(gridcolor='#e0e0e0', showgrid=True),
+        yaxis=dict(gridcolor='#e0e0e0', showgrid=True)
+    )
+    return fig_timeline
@@ -0,0 +1,249 @@
+"""
+SERS Global Solution - Cubo de Consumo por Departamento, Andar e Tempo
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_analyzer import infer_interval_hours
+
+# Granularidades de tempo aceitas na consolidação e período equivalente no pandas
+TIME_GRAINS = {'h': 'h', 'D': 'D', 'W': 'W', 'MS': 'M'}
+
+_SUM, _COUNT, _MAX = 0, 1, 2
+
+
+class ConsumptionCube:
+    """
+    Classe de cubo OLAP de consumo com dimensões codificadas como inteiros
+
+    O cubo é calculado uma única vez: as medidas (soma, contagem e máximo de kWh)
+    ficam em um ndarray plano (medida x célula) de células tempo x departamento x andar. Fatias,
+    recortes e consolidações operam sobre esse array, sem reagrupar os dados brutos.
+    """
+
+    def __init__(self, df, time_grain='h', dimensions=('department', 'floor')):
+        """
+        Calcula o cubo a partir dos dados de consumo
+
+        Args:
+            df (pandas.DataFrame): DataFrame com 'timestamp', 'consumption_kwh' e as dimensões
+            time_grain (str): Granularidade base do tempo ('h', 'D', 'W' ou 'MS')
+            dimensions (tuple): Colunas usadas como dimensões além do tempo
+        """
+        if df is None or df.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+        if time_grain not in TIME_GRAINS:
+            raise ValueError(f"Granularidade {time_grain} não suportada")
+        missing = [column for column in dimensions if column not in df]
+        if missing:
+            raise ValueError(f"Dimensões não encontradas nos dados: {missing}")
+
+        timestamps = pd.DatetimeIndex(df['timestamp'])
+        consumption = df['consumption_kwh'].to_numpy(dtype=float)
+
+        time_codes, self.periods = pd.factorize(_period_starts(timestamps, time_grain), sort=True)
+        codes = [time_codes]
+        self.levels = {}
+        for column in dimensions:
+            column_codes, levels = pd.factorize(df[column], sort=True)
+            codes.append(column_codes)
+            self.levels[column] = levels
+
+        self.time_grain = time_grain
+        self.dimensions = tuple(dimensions)
+        self.interval_hours = infer_interval_hours(timestamps)
+        self._coarse = {}
+        self.shape = (len(self.periods),) + tuple(len(levels) for levels in self.levels.values())
+
+        # Índice plano de cada leitura; soma e contagem por bincount, máximo por reduceat
+        cells = np.ravel_multi_index(codes, self.shape)
+        n_cells = int(np.prod(self.shape))
+        self.measures = np.empty((3, n_cells))
+        self.measures[_SUM] = np.bincount(cells, weights=consumption, minlength=n_cells)
+        self.measures[_COUNT] = np.bincount(cells, minlength=n_cells)
+        self.measures[_MAX] = -np.inf
+
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        self.measures[_MAX, sorted_cells[starts]] = np.maximum.reduceat(consumption[order], starts)
+
+    def query(self, group_by=(), time_grain=None, filters=None):
+        """
+        Consulta o cubo: recorta pelos filtros e consolida nas dimensões pedidas
+
+        Args:
+            group_by (tuple): Dimensões mantidas no resultado (as demais são consolidadas)
+            time_grain (str): Granularidade do tempo no resultado ('h', 'D', 'W', 'MS') ou
+                None para consolidar todo o período
+            filters (dict): Valores aceitos por dimensão, ex.: {'floor': [1, 2]}
+
+        Returns:
+            pandas.DataFrame: Uma linha por combinação com consumo, leituras, consumo
+                máximo por leitura e demanda média (kW)
+        """
+        unknown = [column for column in group_by if column not in self.levels]
+        if unknown:
+            raise ValueError(f"Dimensões não encontradas no cubo: {unknown}")
+
+        cube = self.measures.reshape((3,) + self.shape)
+        labels = {column: levels for column, levels in self.levels.items()}
+        window = slice(0, len(self.periods))
+
+        # Recorte (dice/slice): seleção de posições em cada eixo
+        for column, values in (filters or {}).items():
+            if column == 'timestamp':
+                start, end = values
+                lower = self.periods.searchsorted(pd.Timestamp(start)) if start is not None else 0
+                upper = self.periods.searchsorted(pd.Timestamp(end)) if end is not None else len(self.periods)
+                cube = cube[:, lower:upper]
+                window = slice(lower, upper)
+                continue
+            if column not in self.levels:
+                raise ValueError(f"Dimensão {column} não encontrada no cubo")
+            positions = self.levels[column].get_indexer(pd.Index(np.atleast_1d(values)))
+            if (positions < 0).any():
+                raise ValueError(f"Valores inexistentes na dimensão {column}: {values}")
+            axis = 2 + self.dimensions.index(column)
+            cube = np.take(cube, positions, axis=axis)
+            labels[column] = self.levels[column][positions]
+
+        # Consolidação (roll-up) das dimensões fora do agrupamento
+        rolled = [2 + position for position, column in enumerate(self.dimensions) if column not in group_by]
+        if time_grain is None:
+            rolled.insert(0, 1)
+        cube = _combine(cube, tuple(rolled))
+
+        keys = []
+        if time_grain is not None:
+            if time_grain not in TIME_GRAINS:
+                raise ValueError(f"Granularidade {time_grain} não suportada")
+            if not _is_coarser(time_grain, self.time_grain):
+                raise ValueError(f"Granularidade {time_grain} não é consolidável a partir de {self.time_grain}")
+            coarse = self._coarse_periods(time_grain)[window]
+            starts = np.flatnonzero(np.r_[True, coarse[1:] != coarse[:-1]])
+            if len(coarse):
+                cube = np.concatenate([
+                    np.add.reduceat(cube[:_MAX], starts, axis=1),
+                    np.maximum.reduceat(cube[_MAX:], starts, axis=1)
+                ])
+            keys.append(('timestamp', coarse[starts] if len(coarse) else coarse))
+        keys.extend((column, labels[column]) for column in self.dimensions if column in group_by)
+
+        # Combinações sem leituras (ex.: andar sem o departamento) não aparecem no resultado
+        flat = cube.reshape(3, -1)
+        observed = flat[_COUNT] > 0
+        columns = {name: values[observed] for (name, _), values in
+                   zip(keys, _expand_keys([np.asarray(values) for _, values in keys]))}
+        totals, readings, peaks = flat[:, observed]
+
+        columns['consumption_kwh'] = totals.round(2)
+        columns['readings'] = readings.astype(np.int64)
+        columns['max_kwh'] = peaks.round(2)
+        columns['average_demand_kw'] = (totals / (readings * self.interval_hours)).round(2)
+        return pd.DataFrame(columns)
+
+    def _coarse_periods(self, time_grain):
+        """Início do período consolidado de cada período base, calculado uma vez por granularidade"""
+        if time_grain not in self._coarse:
+            self._coarse[time_grain] = _period_starts(self.periods, time_grain).to_numpy()
+        return self._coarse[time_grain]
+
+    def slice(self, dimension, value, group_by=(), time_grain=None):
+        """
+        Fatia o cubo fixando uma dimensão em um único valor
+
+        Args:
+            dimension (str): Dimensão fixada (ex.: 'floor')
+            value: Valor da dimensão
+            group_by (tuple): Dimensões mantidas no resultado
+            time_grain (str): Granularidade do tempo no resultado (opcional)
+
+        Returns:
+            pandas.DataFrame: Resultado da consulta
+        """
+        return self.query(group_by, time_grain, filters={dimension: [value]})
+
+    def dice(self, filters, group_by=(), time_grain=None):
+        """
+        Recorta um subcubo com vários valores por dimensão
+
+        Args:
+            filters (dict): Valores aceitos por dimensão; 'timestamp' recebe (início, fim)
+            group_by (tuple): Dimensões mantidas no resultado
+            time_grain (str): Granularidade do tempo no resultado (opcional)
+
+        Returns:
+            pandas.DataFrame: Resultado da consulta
+        """
+        return self.query(group_by, time_grain, filters=filters)
+
+    def rollup(self, group_by=(), time_grain=None):
+        """
+        Consolida o cubo inteiro nas dimensões e granularidade informadas
+
+        Args:
+            group_by (tuple): Dimensões mantidas no resultado
+            time_grain (str): Granularidade do tempo no resultado (opcional)
+
+        Returns:
+            pandas.DataFrame: Resultado da consulta
+        """
+        return self.query(group_by, time_grain)
+
+
+def _is_coarser(target, base):
+    """Indica se os períodos da base se encaixam inteiros nos períodos do alvo"""
+    order = list(TIME_GRAINS)
+    if base == 'W':
+        # Semanas não se encaixam em meses
+        return target == 'W'
+    return order.index(target) >= order.index(base)
+
+
+def _period_starts(timestamps, time_grain):
+    """Início do período de cada instante na granularidade informada"""
+    timestamps = pd.DatetimeIndex(timestamps)
+    if time_grain in ('h', 'D'):
+        return timestamps.floor(time_grain)
+    return timestamps.to_period(TIME_GRAINS[time_grain]).start_time
+
+
+def _combine(cube, axes):
+    """Consolida eixos somando soma/contagem e tomando o máximo do máximo"""
+    if not axes:
+        return cube
+    totals = cube[:_MAX].sum(axis=axes)
+    peaks = cube[_MAX:].max(axis=axes, initial=-np.inf)
+    return np.concatenate([totals, peaks])
+
+
+def _expand_keys(levels):
+    """Produto cartesiano dos rótulos, na ordem das células do array consolidado"""
+    if not levels:
+        return []
+    grids = np.meshgrid(*[np.arange(len(values)) for values in levels], indexing='ij')
+    return [values[grid.ravel()] for values, grid in zip(levels, grids)]
+
+
+if __name__ == "__main__":
+    import time
+
+    from data_analyzer import EnergyAnalyzer
+
+    data = EnergyAnalyzer().generate_consumption_data(365, seed=0, freq='15min')
+
+    start = time.perf_counter()
+    cube = ConsumptionCube(data)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    by_floor = cube.rollup(group_by=('floor',))
+    monthly = cube.dice({'department': ['TI', 'RH'], 'floor': [1, 2]}, group_by=('department',), time_grain='MS')
+    third_floor = cube.slice('floor', 3, group_by=('department',), time_grain='W')
+    queried = time.perf_counter() - start
+
+    print(f"Cubo {cube.shape} de {len(data)} leituras em {built * 1000:.0f} ms; 3 consultas em {queried * 1000:.1f} ms")
+    print(by_floor)
+    print(monthly.head())
@@ -2,10 +2,24 @@
 SERS Global Solution - Módulo de Análise de Dados de Consumo Energético
 """
 
+import math
+import warnings
+from statistics import NormalDist
+
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
+
+from recommendation_rules import RecommendationEngine
+
+DEPARTMENTS = ['TI', 'ADMINISTRATIVO', 'COMERCIAL', 'RH']
+
+# Métricas que são horas do dia: comparadas pelo deslocamento, não em porcentagem
+_HOUR_METRICS = ('peak_hour',)
+
+# Frequências cujos períodos são rotulados pelo início (mesma convenção do resample)
+_START_ANCHORED_OFFSETS = (pd.offsets.Tick, pd.offsets.Day, pd.offsets.MonthBegin,
+                           pd.offsets.QuarterBegin, pd.offsets.YearBegin)
 
 class EnergyAnalyzer:
     """
@@ -16,54 +30,67 @@ class EnergyAnalyzer:
         """Inicializa o analisador com parâmetros padrão"""
         self.data = None
         self.insights = {}
+        self.quality_report = None
+        self.recommendation_engine = RecommendationEngine()
         
-    def generate_consumption_data(self, days=7):
+    def generate_consumption_data(self, days=7, seed=None, freq='h'):
         """
         Gera dados simulados de consumo energético corporativo
         
         Args:
             days (int): Número de dias para simular
+            seed (int): Semente aleatória para dados reproduzíveis (opcional)
+            freq (str): Intervalo de medição (ex.: 'h' para horário, '15min')
             
         Returns:
-            pandas.DataFrame: DataFrame com dados de consumo
+            pandas.DataFrame: DataFrame com dados de consumo (kWh por intervalo)
         """
         start_date = datetime(2025, 1, 1)
-        dates = pd.date_range(start=start_date, periods=days*24, freq='H')
+        interval_hours = pd.Timedelta(pd.tseries.frequencies.to_offset(freq)) / pd.Timedelta(hours=1)
+        periods = int(round(days * 24 / interval_hours))
+        dates = pd.date_range(start=start_date, periods=periods, freq=freq)
+        rng = np.random.default_rng(seed)
         
-        data = []
-        for date in dates:
-            base_consumption = 50
-            
-            hour = date.hour
-            if 8 <= hour <= 18:
-                hour_factor = 1.8
-            else:
-                hour_factor = 0.6
-                
-            weekday = date.weekday()
-            if weekday >= 5:
-                day_factor = 0.7
-            else:
-                day_factor = 1.0
-                
-            random_variation = np.random.normal(0, 5)
-            consumption = base_consumption * hour_factor * day_factor + random_variation
-            consumption = max(consumption, 10)
-            
-            record = {
-                'timestamp': date,
-                'consumption_kwh': round(consumption, 2),
-                'department': random.choice(['TI', 'ADMINISTRATIVO', 'COMERCIAL', 'RH']),
-                'floor': random.randint(1, 4),
-                'hour': hour,
-                'weekday': weekday
-            }
-            
-            data.append(record)
+        base_consumption = 50
+        hour = dates.hour.to_numpy()
+        weekday = dates.weekday.to_numpy()
+        hour_factor = np.where((hour >= 8) & (hour <= 18), 1.8, 0.6)
+        day_factor = np.where(weekday >= 5, 0.7, 1.0)
+        
+        random_variation = rng.normal(0, 5, periods)
+        consumption = base_consumption * hour_factor * day_factor + random_variation
+        consumption = np.maximum(consumption, 10) * interval_hours
         
-        self.data = pd.DataFrame(data)
+        self.data = pd.DataFrame({
+            'timestamp': dates,
+            'consumption_kwh': np.round(consumption, 2),
+            'department': np.array(DEPARTMENTS, dtype=object)[rng.integers(len(DEPARTMENTS), size=periods)],
+            'floor': rng.integers(1, 5, size=periods),
+            'hour': hour,
+            'weekday': weekday
+        })
         return self.data
-    
+
+    def clean_consumption_data(self, df, meter_col=None, counter_col=None, **options):
+        """
+        Limpa leituras brutas de medidores antes da análise
+
+        Args:
+            df (pandas.DataFrame): Leituras brutas com 'timestamp' e 'consumption_kwh'
+            meter_col (str ou list): Coluna(s) que identificam o medidor (padrão:
+                'department' e 'floor', quando presentes)
+            counter_col (str): Coluna do registrador acumulado em kWh (opcional)
+            **options: Parâmetros de DataQualityPipeline (ex.: max_gap_intervals)
+
+        Returns:
+            pandas.DataFrame: Leituras em grade regular, sem duplicatas nem picos espúrios
+        """
+        # Importação tardia: data_quality depende deste módulo
+        from data_quality import DataQualityPipeline
+
+        cleaned, self.quality_report = DataQualityPipeline(**options).clean(df, meter_col, counter_col)
+        return cleaned
+
     def analyze_consumption_patterns(self, df):
         """
         Analisa padrões de consumo nos dados
@@ -77,75 +104,633 @@ class EnergyAnalyzer:
         if df is None or df.empty:
             raise ValueError("DataFrame vazio ou não fornecido")
         
+        self.insights = self._compute_insights(df)
+        return self.insights
+    
+    def _compute_insights(self, df):
+        """Núcleo da análise de padrões, sem efeitos colaterais no analisador"""
         insights = {}
         
-        insights['total_consumption'] = round(df['consumption_kwh'].sum(), 2)
+        consumption = df['consumption_kwh'].to_numpy(dtype=float)
+        hour, weekday = _time_features(df)
+        interval_hours = infer_interval_hours(df['timestamp']) if 'timestamp' in df else 1.0
+        
+        insights['total_consumption'] = round(consumption.sum(), 2)
         
-        hourly_consumption = df.groupby('hour')['consumption_kwh'].mean()
-        insights['peak_hour'] = hourly_consumption.idxmax()
+        hourly_consumption = self.hourly_profile(df)
+        insights['peak_hour'] = int(hourly_consumption.idxmax())
         insights['peak_consumption'] = round(hourly_consumption.max(), 2)
+        insights['hourly_consumption'] = hourly_consumption.round(2).to_dict()
         
-        dept_consumption = df.groupby('department')['consumption_kwh'].mean()
-        insights['highest_consumption_dept'] = dept_consumption.idxmax()
-        insights['department_consumption'] = dept_consumption.round(2).to_dict()
+        # Demanda média por leitura (kW), independente do intervalo de medição
+        dept_stats = df.groupby('department')['consumption_kwh'].agg(['sum', 'mean'])
+        dept_demand = dept_stats['mean'] / interval_hours
+        insights['highest_consumption_dept'] = dept_demand.idxmax()
+        insights['department_demand_kw'] = dept_demand.round(2).to_dict()
+        insights['department_totals'] = dept_stats['sum'].round(2).to_dict()
         
-        night_consumption = df[df['hour'].between(0, 6)]['consumption_kwh'].sum()
+        hour_totals = np.bincount(hour, weights=consumption, minlength=24)
+        
+        night_consumption = hour_totals[0:7].sum()
         insights['night_waste'] = round((night_consumption / insights['total_consumption']) * 100, 2)
         
-        off_hours_consumption = df[~df['hour'].between(8, 18)]['consumption_kwh'].sum()
+        off_hours_consumption = hour_totals[:8].sum() + hour_totals[19:].sum()
         insights['off_hours_consumption'] = round((off_hours_consumption / insights['total_consumption']) * 100, 2)
         
-        weekday_avg = df[df['weekday'] < 5]['consumption_kwh'].mean()
-        weekend_avg = df[df['weekday'] >= 5]['consumption_kwh'].mean()
+        weekend = weekday >= 5
+        weekend_totals = np.bincount(weekend, weights=consumption, minlength=2)
+        weekend_counts = np.bincount(weekend, minlength=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weekday_avg, weekend_avg = weekend_totals / weekend_counts
         insights['weekend_difference'] = round(((weekend_avg - weekday_avg) / weekday_avg) * 100, 2)
         
-        self.insights = insights
+        if 'timestamp' in df:
+            demand_peaks = self.analyze_demand_peaks(df)
+            insights['peak_demand_kw'] = round(demand_peaks['peak_demand_kw'].max(), 2)
+            # Demanda média de toda a janela (energia total / horas medidas) sobre o maior pico
+            average_demand = consumption.sum() / (df['timestamp'].nunique() * interval_hours)
+            insights['load_factor'] = round(average_demand / demand_peaks['peak_demand_kw'].max(), 3)
+        
         return insights
     
-    def generate_recommendations(self, insights):
+    def compare_periods(self, df, before, after, alpha=0.05):
+        """
+        Compara dois períodos (ex.: antes e depois de uma medida de eficiência)
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com dados de consumo
+            before (tuple): (início, fim) do período base; o fim não é incluído
+            after (tuple): (início, fim) do período de comparação; o fim não é incluído
+            alpha (float): Nível de significância do teste de médias diárias
+            
+        Returns:
+            dict: Insights de cada período, variações por métrica ('deltas') e teste
+                t de Welch sobre o consumo diário ('test')
+        """
+        return self.compare_windows(df, [before, after], alpha=alpha)[0]
+    
+    def compare_windows(self, df, windows, baseline=0, alpha=0.05):
+        """
+        Compara vários períodos contra um período base, fatiando o DataFrame
+        ordenado por tempo com busca binária (sem varrer a coluna inteira)
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com dados de consumo
+            windows (list): Lista de tuplas (início, fim); o fim não é incluído
+            baseline (int): Posição do período base na lista
+            alpha (float): Nível de significância do teste de médias diárias
+            
+        Returns:
+            list: Uma comparação (como em compare_periods) para cada período além do base
+        """
+        if df is None or df.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+        
+        if not df['timestamp'].is_monotonic_increasing:
+            df = df.sort_values('timestamp', kind='stable')
+        timestamps = pd.DatetimeIndex(df['timestamp'])
+        
+        slices = []
+        for start, end in windows:
+            lower = timestamps.searchsorted(_as_column_time(start, timestamps.tz), side='left')
+            upper = timestamps.searchsorted(_as_column_time(end, timestamps.tz), side='left')
+            if upper <= lower:
+                raise ValueError(f"Período {start} - {end} não contém dados")
+            slices.append(df.iloc[lower:upper])
+        
+        insights = [self._compute_insights(window) for window in slices]
+        daily = [self.resample_consumption(window, 'D').dropna().to_numpy() for window in slices]
+        
+        comparisons = []
+        for position in range(len(windows)):
+            if position == baseline:
+                continue
+            comparisons.append({
+                'before': insights[baseline],
+                'after': insights[position],
+                'deltas': _insight_deltas(insights[baseline], insights[position]),
+                'test': _welch_test(daily[baseline], daily[position], alpha)
+            })
+        return comparisons
+    
+    def hourly_profile(self, df):
+        """
+        Calcula o consumo médio (kWh) de cada hora do dia para qualquer intervalo de medição
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com dados de consumo
+            
+        Returns:
+            pandas.Series: Consumo médio por hora do dia (índice 0-23)
+        """
+        consumption = df['consumption_kwh'].to_numpy(dtype=float)
+        hour, _ = _time_features(df)
+        hour_totals = np.bincount(hour, weights=consumption, minlength=24)
+        
+        if 'timestamp' in df:
+            # Número de horas de relógio distintas observadas em cada hora do dia
+            hour_buckets = np.unique(pd.DatetimeIndex(df['timestamp']).floor('h').to_numpy())
+            hour_counts = np.bincount(pd.DatetimeIndex(hour_buckets).hour.to_numpy(), minlength=24)
+        else:
+            hour_counts = np.bincount(hour, minlength=24)
+        
+        present = hour_counts > 0
+        return pd.Series(hour_totals[present] / hour_counts[present],
+                         index=pd.Index(np.flatnonzero(present), name='hour'), name='consumption_kwh')
+    
+    def resample_consumption(self, df, freq='h', meter_col=None):
+        """
+        Agrega o consumo por intervalo em uma granularidade mais grossa
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com 'timestamp' e 'consumption_kwh'
+            freq (str): Granularidade de saída ('h', 'D', 'MS', ...)
+            meter_col (str): Coluna que identifica o medidor (opcional)
+            
+        Returns:
+            pandas.Series ou pandas.DataFrame: Energia (kWh) por período;
+                com meter_col, uma coluna por medidor. Períodos sem nenhuma
+                leitura ficam como NaN (não medidos), e não como consumo zero
+        """
+        if meter_col is None:
+            series = pd.Series(df['consumption_kwh'].to_numpy(dtype=float, copy=False),
+                               index=pd.DatetimeIndex(df['timestamp']), copy=False)
+            if series.index.is_monotonic_increasing:
+                return series.resample(freq).sum(min_count=1)
+            return series.sort_index().resample(freq).sum(min_count=1)
+        
+        offset = pd.tseries.frequencies.to_offset(freq)
+        if not isinstance(offset, _START_ANCHORED_OFFSETS):
+            grouper = pd.Grouper(key='timestamp', freq=freq)
+            return df.groupby([grouper, meter_col])['consumption_kwh'].sum().unstack(meter_col)
+        
+        # Matriz densa (período x medidor) montada com searchsorted + bincount
+        timestamps = pd.DatetimeIndex(df['timestamp'])
+        start = offset.rollback(timestamps.min().floor('D'))
+        edges = pd.date_range(start, timestamps.max(), freq=offset)
+        periods = np.searchsorted(edges.to_numpy(), timestamps.to_numpy(), side='right') - 1
+        
+        meter_codes, meters = pd.factorize(df[meter_col], sort=True)
+        cells = periods * len(meters) + meter_codes
+        totals = np.bincount(cells, weights=df['consumption_kwh'].to_numpy(dtype=float),
+                             minlength=len(edges) * len(meters))
+        totals[np.bincount(cells, minlength=len(edges) * len(meters)) == 0] = np.nan
+        return pd.DataFrame(totals.reshape(len(edges), len(meters)),
+                            index=edges.rename('timestamp'), columns=pd.Index(meters, name=meter_col))
+    
+    def consumption_views(self, df):
+        """
+        Gera as visões horária, diária e mensal do consumo em cascata
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com dados de consumo
+            
+        Returns:
+            dict: Séries de energia (kWh) 'hourly', 'daily' e 'monthly' (NaN nos períodos sem leitura)
+        """
+        hourly = self.resample_consumption(df, 'h')
+        daily = hourly.resample('D').sum(min_count=1)
+        monthly = daily.resample('MS').sum(min_count=1)
+        return {'hourly': hourly, 'daily': daily, 'monthly': monthly}
+    
+    def analyze_demand_peaks(self, df, meter_col=None):
+        """
+        Calcula a demanda máxima mensal (maior pico de um intervalo) e o fator de carga
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com 'timestamp' e 'consumption_kwh'
+            meter_col (str): Coluna que identifica o medidor (opcional)
+            
+        Returns:
+            pandas.DataFrame: Por mês (e medidor), energia, demanda máxima, instante
+                do pico, demanda média e fator de carga
+        """
+        if df is None or df.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+        
+        interval_hours = infer_interval_hours(df['timestamp'])
+        keys = ['timestamp'] if meter_col is None else [meter_col, 'timestamp']
+        
+        # Soma leituras simultâneas (ex.: vários circuitos) antes de medir a demanda
+        load = df.groupby(keys, sort=True)['consumption_kwh'].sum().reset_index()
+        load['demand_kw'] = load['consumption_kwh'] / interval_hours
+        # Mês do horário local: instantes com fuso perdem só o fuso, não a hora de parede
+        load['month'] = pd.DatetimeIndex(load['timestamp']).tz_localize(None).to_period('M')
+        
+        group_keys = ['month'] if meter_col is None else [meter_col, 'month']
+        grouped = load.groupby(group_keys, sort=True)
+        peak_rows = grouped['demand_kw'].idxmax()
+        
+        peaks = grouped.agg(energy_kwh=('consumption_kwh', 'sum'),
+                            peak_demand_kw=('demand_kw', 'max'),
+                            intervals=('demand_kw', 'size'))
+        peaks['peak_timestamp'] = load.loc[peak_rows.to_numpy(), 'timestamp'].to_numpy()
+        peaks['average_demand_kw'] = peaks['energy_kwh'] / (peaks['intervals'] * interval_hours)
+        peaks['load_factor'] = peaks['average_demand_kw'] / peaks['peak_demand_kw']
+        return peaks.drop(columns='intervals')
+    
+    def detect_anomalies(self, df, method='mad', window=8, threshold=3.5, min_periods=3,
+                         group_col='department', seasonality='auto', two_sided=False,
+                         min_scale_ratio=0.1):
+        """
+        Detecta intervalos anômalos comparando cada leitura com a linha de base
+        do mesmo grupo e do mesmo horário da semana (ou do dia)
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com dados de consumo
+            method (str): 'mad' (mediana/MAD móveis) ou 'ewma' (média/variância exponenciais)
+            window (int): Número de ocorrências anteriores na linha de base ('mad') ou
+                span da média exponencial ('ewma')
+            threshold (float): Escore acima do qual o intervalo é anômalo
+            min_periods (int): Ocorrências anteriores mínimas para avaliar um intervalo
+            group_col (str): Coluna de agrupamento (departamento, medidor...); None para série única
+            seasonality (str): 'week' (horário da semana), 'day' (horário do dia) ou 'auto'
+            two_sided (bool): Também sinaliza consumo abaixo da linha de base
+            min_scale_ratio (float): Dispersão mínima como fração da linha de base, evitando
+                escores explosivos quando o histórico é quase constante
+            
+        Returns:
+            pandas.DataFrame: Leituras com 'baseline_kwh', 'anomaly_score' e 'is_anomaly'
+        """
+        if df is None or df.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+        if method not in ('mad', 'ewma'):
+            raise ValueError(f"Método {method} não suportado")
+        
+        index = pd.DatetimeIndex(df['timestamp'])
+        values = df['consumption_kwh'].to_numpy(dtype=float)
+        interval_minutes = max(int(round(infer_interval_hours(index) * 60)), 1)
+        
+        group_codes = np.zeros(len(df), dtype=np.int64)
+        if group_col is not None:
+            group_codes = pd.factorize(df[group_col])[0].astype(np.int64)
+        
+        day_minutes = index.hour.to_numpy() * 60 + index.minute.to_numpy()
+        week_minutes = day_minutes + index.weekday.to_numpy() * 1440
+        slots_per_week = 7 * 1440 // interval_minutes
+        week_key = group_codes * slots_per_week + week_minutes // interval_minutes
+        
+        # Sazonalidade semanal só quando cada série tem histórico suficiente
+        if seasonality == 'auto':
+            occurrences = len(df) / len(np.unique(week_key))
+            seasonality = 'week' if occurrences >= 2 * min_periods else 'day'
+        if seasonality == 'week':
+            key = week_key
+        else:
+            key = group_codes * (1440 // interval_minutes) + day_minutes // interval_minutes
+        
+        # Matriz densa (série x ocorrência), com cada série em ordem cronológica
+        order = np.lexsort((index.to_numpy(), key))
+        sorted_key = key[order]
+        new_series = np.r_[True, sorted_key[1:] != sorted_key[:-1]]
+        series_id = np.cumsum(new_series) - 1
+        starts = np.flatnonzero(new_series)
+        occurrence = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        
+        grid = np.full((len(starts), occurrence.max() + 1), np.nan)
+        grid[series_id, occurrence] = values[order]
+        
+        if method == 'mad':
+            baseline, scale = _rolling_median_mad(grid, window)
+            scale = scale / 0.6745
+        else:
+            baseline, scale = _ewma_baseline(grid, window)
+        scale = np.maximum(scale, min_scale_ratio * np.abs(baseline))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            history = np.minimum(occurrence, window) if method == 'mad' else occurrence
+            score_sorted = (values[order] - baseline[series_id, occurrence]) / scale[series_id, occurrence]
+        score_sorted = np.where(history >= min_periods, score_sorted, np.nan)
+        
+        baseline_values = np.empty(len(df))
+        baseline_values[order] = baseline[series_id, occurrence]
+        scores = np.empty(len(df))
+        scores[order] = score_sorted
+        
+        flagged = np.abs(scores) if two_sided else scores
+        result = df[['timestamp', 'consumption_kwh'] + ([group_col] if group_col is not None else [])].copy()
+        result['baseline_kwh'] = np.round(baseline_values, 2)
+        result['anomaly_score'] = np.round(scores, 2)
+        result['is_anomaly'] = np.nan_to_num(flagged, nan=0.0) > threshold
+        
+        self.anomalies = result
+        return result
+    
+    def forecast_consumption(self, df, horizon_days=30, group_col='department', interval=0.95,
+                             seasonality='auto', trend=True):
+        """
+        Prevê o consumo horário futuro com linha de base sazonal (horário da semana)
+        e tendência linear, ajustada por mínimos quadrados para todos os grupos de uma vez
+        
+        Args:
+            df (pandas.DataFrame): DataFrame com dados de consumo
+            horizon_days (int): Número de dias a prever
+            group_col (str): Coluna de agrupamento (departamento, medidor...); None para o total.
+                Horas medidas sem leitura de um grupo contam como 0 kWh para ele
+            interval (float): Nível de confiança do intervalo de previsão
+            seasonality (str): 'week' (168 horas), 'day' (24 horas) ou 'auto'
+            trend (bool): Inclui tendência linear no modelo
+            
+        Returns:
+            pandas.DataFrame: Previsão com 'timestamp', grupo, 'consumption_kwh' (previsto),
+                'lower_kwh', 'upper_kwh', 'hour' e 'weekday'; pode ser usada diretamente
+                como consumption_data do SolarSimulator
+        """
+        if df is None or df.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+        if horizon_days <= 0:
+            raise ValueError("Horizonte de previsão deve ser maior que zero")
+        
+        if group_col is None:
+            history = self.resample_consumption(df, 'h').to_frame('total')
+        else:
+            history = self.resample_consumption(df, 'h', meter_col=group_col)
+            # Os grupos repartem as leituras do site: hora medida sem leitura do grupo vale 0 kWh;
+            # só as horas sem nenhuma leitura do site ficam fora do ajuste
+            measured = history.notna().any(axis=1)
+            history.loc[measured] = history.loc[measured].fillna(0.0)
+        
+        index = history.index
+        if seasonality == 'auto':
+            seasonality = 'week' if len(index) >= 14 * 24 else 'day'
+        
+        future = pd.date_range(index[-1] + pd.Timedelta(hours=1), periods=horizon_days * 24, freq='h')
+        design = _seasonal_design(index, index[0], seasonality, trend)
+        future_design = _seasonal_design(future, index[0], seasonality, trend)
+        
+        targets = history.to_numpy(dtype=float)
+        coefficients, sigma = _masked_lstsq(design, targets)
+
+        z = NormalDist().inv_cdf(0.5 + interval / 2)
+        predicted = np.maximum(future_design @ coefficients, 0.0)
+        lower = np.maximum(predicted - z * sigma, 0.0)
+        upper = predicted + z * sigma
+        
+        n_groups = targets.shape[1]
+        forecast = pd.DataFrame({
+            'timestamp': np.repeat(future.to_numpy(), n_groups),
+            'consumption_kwh': predicted.ravel().round(2),
+            'lower_kwh': lower.ravel().round(2),
+            'upper_kwh': upper.ravel().round(2),
+            'hour': np.repeat(future.hour.to_numpy(), n_groups),
+            'weekday': np.repeat(future.weekday.to_numpy(), n_groups)
+        })
+        if group_col is not None:
+            forecast.insert(1, group_col, np.tile(history.columns.to_numpy(), len(future)))
+        
+        self.forecast = forecast
+        return forecast
+    
+    def summarize_anomalies(self, anomalies, top=5):
+        """
+        Resume as anomalias detectadas: quantidade, excesso de consumo e principais ocorrências
+        
+        Args:
+            anomalies (pandas.DataFrame): Resultado de detect_anomalies
+            top (int): Número de ocorrências de maior excesso a listar
+            
+        Returns:
+            dict: Resumo das anomalias
+        """
+        flagged = anomalies[anomalies['is_anomaly'].to_numpy()]
+        excess = (flagged['consumption_kwh'] - flagged['baseline_kwh']).clip(lower=0)
+        total = anomalies['consumption_kwh'].sum()
+        
+        top_rows = flagged.assign(excess_kwh=excess.round(2)).nlargest(top, 'excess_kwh')
+        return {
+            'anomaly_count': int(len(flagged)),
+            'anomaly_excess_kwh': round(float(excess.sum()), 2),
+            'anomaly_excess_pct': round(float(excess.sum() / total * 100), 2) if total else 0.0,
+            'top_anomalies': top_rows.drop(columns=['is_anomaly']).to_dict('records')
+        }
+    
+    def generate_recommendations(self, insights, anomalies=None):
         """
         Gera recomendações baseadas nos insights da análise
         
         Args:
             insights (dict): Dicionário com insights da análise
+            anomalies (pandas.DataFrame): Resultado de detect_anomalies (opcional)
             
         Returns:
             list: Lista de recomendações
         """
-        recommendations = []
+        metrics = dict(insights)
+        if anomalies is not None:
+            summary = self.summarize_anomalies(anomalies, top=1)
+            metrics['anomaly_count'] = summary['anomaly_count']
+            metrics['anomaly_excess_pct'] = summary['anomaly_excess_pct']
+            if summary['top_anomalies']:
+                worst = summary['top_anomalies'][0]
+                metrics['anomaly_worst_location'] = f" em {worst['department']}" if 'department' in worst else ''
+                metrics['anomaly_worst_timestamp'] = worst['timestamp']
+                metrics['anomaly_worst_excess_kwh'] = worst['excess_kwh']
         
-        if insights['night_waste'] > 15:
-            recommendations.append({
-                'priority': 'HIGH',
-                'title': 'Automação de Desligamento Noturno',
-                'description': f'Desperdício noturno de {insights["night_waste"]}% detectado. Implementar sistema automático de desligamento.',
-                'estimated_savings': f'{insights["night_waste"] * 0.8:.1f}% do consumo total'
-            })
-        elif insights['night_waste'] > 8:
-            recommendations.append({
-                'priority': 'MEDIUM',
-                'title': 'Otimização de Equipamentos Noturnos',
-                'description': f'Consumo noturno de {insights["night_waste"]}%. Avaliar equipamentos que permanecem ligados.',
-                'estimated_savings': f'{insights["night_waste"] * 0.6:.1f}% do consumo total'
-            })
+        return self.recommendation_engine.recommend(metrics)
+
+def infer_interval_hours(timestamps):
+    """
+    Infere a duração do intervalo de medição (em horas) pela mediana dos passos
+    
+    Args:
+        timestamps (array-like): Instantes de início de cada leitura
         
-        if insights['off_hours_consumption'] > 40:
-            recommendations.append({
-                'priority': 'HIGH',
-                'title': 'Política de Horário Comercial',
-                'description': f'Alto consumo ({insights["off_hours_consumption"]}%) fora do horário comercial. Revisar políticas de uso.',
-                'estimated_savings': '15-25% do consumo total'
-            })
+    Returns:
+        float: Duração do intervalo em horas
+    """
+    values = np.unique(pd.DatetimeIndex(timestamps).to_numpy())
+    if len(values) < 2:
+        return 1.0
+    return float(np.median(np.diff(values) / np.timedelta64(1, 'h')))
+
+
+def month_segments(timestamps):
+    """
+    Localiza os meses de calendário como segmentos contíguos de uma série ordenada
+    
+    Args:
+        timestamps (array-like): Instantes em ordem crescente
         
-        highest_dept = insights['highest_consumption_dept']
-        recommendations.append({
-            'priority': 'LOW',
-            'title': f'Otimização no Departamento {highest_dept}',
-            'description': f'Departamento com maior consumo médio. Avaliar equipamentos e processos.',
-            'estimated_savings': '5-15% do consumo departamental'
+    Returns:
+        tuple: (meses como datetime64[M], posição inicial de cada mês)
+    """
+    month_codes = pd.DatetimeIndex(timestamps).to_numpy().astype('datetime64[M]')
+    starts = np.flatnonzero(np.r_[True, month_codes[1:] != month_codes[:-1]])
+    return month_codes[starts], starts
+
+
+def _as_column_time(value, tz):
+    """Limite de período no fuso da coluna de instantes (sem fuso: horário de parede)"""
+    bound = pd.Timestamp(value)
+    if tz is not None:
+        return bound.tz_localize(tz) if bound.tz is None else bound.tz_convert(tz)
+    return bound.tz_localize(None) if bound.tz is not None else bound
+
+
+def _insight_deltas(before, after):
+    """Variação absoluta e percentual de cada métrica numérica entre dois conjuntos de insights"""
+    rows = []
+    for metric, value in before.items():
+        other = after.get(metric)
+        if isinstance(value, (dict, str)) or not isinstance(other, (int, float, np.number)):
+            continue
+        if metric in _HOUR_METRICS:
+            # Hora do dia: deslocamento no relógio (ex.: 23h -> 1h = +2h), sem variação percentual
+            rows.append({'metric': metric, 'before': value, 'after': other,
+                         'delta': float((other - value + 12) % 24 - 12), 'delta_pct': np.nan})
+            continue
+        delta = other - value
+        rows.append({
+            'metric': metric,
+            'before': value,
+            'after': other,
+            'delta': round(float(delta), 2),
+            'delta_pct': round(float(delta / value * 100), 2) if value else np.nan
         })
-        
-        return recommendations
+    return pd.DataFrame(rows)
+
+
+def _welch_test(before, after, alpha):
+    """Teste t de Welch (bicaudal) para a diferença entre as médias diárias"""
+    mean_before, mean_after = before.mean(), after.mean()
+    result = {
+        'mean_daily_before': round(float(mean_before), 2),
+        'mean_daily_after': round(float(mean_after), 2),
+        'change_pct': round(float((mean_after - mean_before) / mean_before * 100), 2) if mean_before else np.nan,
+        't_statistic': np.nan,
+        'p_value': np.nan,
+        'significant': False
+    }
+    if len(before) < 2 or len(after) < 2:
+        return result
+    
+    var_before = before.var(ddof=1) / len(before)
+    var_after = after.var(ddof=1) / len(after)
+    standard_error = np.sqrt(var_before + var_after)
+    if standard_error == 0:
+        return result
+    
+    t_statistic = (mean_after - mean_before) / standard_error
+    dof = (var_before + var_after) ** 2 / (var_before ** 2 / (len(before) - 1) + var_after ** 2 / (len(after) - 1))
+    p_value = _betainc(dof / 2, 0.5, dof / (dof + t_statistic ** 2))
+    
+    result['t_statistic'] = round(float(t_statistic), 3)
+    result['p_value'] = round(float(p_value), 4)
+    result['significant'] = bool(p_value < alpha)
+    return result
+
+
+def _betainc(a, b, x):
+    """Função beta incompleta regularizada I_x(a, b), por frações contínuas"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log(1 - x))
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _betainc(b, a, 1 - x)
+    
+    # Algoritmo de Lentz para a fração contínua
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 200):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return math.exp(log_front) * result / a
+
+
+def _seasonal_design(index, origin, seasonality, trend):
+    """Matriz de regressão: indicadoras do horário da semana (ou do dia) e tendência em dias"""
+    slot = index.hour.to_numpy()
+    n_slots = 24
+    if seasonality == 'week':
+        slot = slot + index.weekday.to_numpy() * 24
+        n_slots = 168
+    design = np.zeros((len(index), n_slots + int(trend)))
+    design[np.arange(len(index)), slot] = 1.0
+    if trend:
+        design[:, -1] = (index - origin) / pd.Timedelta(days=1)
+    return design
+
+
+def _masked_lstsq(design, targets):
+    """
+    Ajuste de mínimos quadrados de várias séries, ignorando os intervalos sem leitura (NaN)
+
+    Séries com o mesmo padrão de lacunas compartilham um único ajuste, com todas
+    elas como colunas do lado direito; intervalos não observados ficam fora das
+    linhas da regressão e não puxam nível nem tendência para baixo.
+
+    Returns:
+        tuple: (coeficientes de cada série, desvio padrão dos resíduos de cada série)
+    """
+    observed = ~np.isnan(targets)
+    coefficients = np.zeros((design.shape[1], targets.shape[1]))
+    sigma = np.zeros(targets.shape[1])
+
+    patterns, pattern_of = np.unique(observed.T, axis=0, return_inverse=True)
+    for position, rows in enumerate(patterns):
+        columns = np.flatnonzero(pattern_of.ravel() == position)
+        if not rows.any():
+            continue
+        fitted, _, rank, _ = np.linalg.lstsq(design[rows], targets[rows][:, columns], rcond=None)
+        residuals = targets[rows][:, columns] - design[rows] @ fitted
+        coefficients[:, columns] = fitted
+        sigma[columns] = np.sqrt((residuals ** 2).sum(axis=0) / max(int(rows.sum()) - rank, 1))
+    return coefficients, sigma
+
+
+def _rolling_median_mad(grid, window):
+    """Mediana e MAD das `window` ocorrências anteriores, para todas as séries de uma vez"""
+    padded = np.concatenate([np.full((grid.shape[0], window), np.nan), grid], axis=1)
+    previous = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)[:, :grid.shape[1]]
+    # np.median é bem mais rápido; nanmedian só nas janelas incompletas
+    partial = np.isnan(previous).any(axis=-1)
+    median = np.median(previous, axis=-1)
+    deviation = np.abs(previous - median[..., None])
+    mad = np.median(deviation, axis=-1)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median[partial] = np.nanmedian(previous[partial], axis=-1)
+        mad[partial] = np.nanmedian(np.abs(previous[partial] - median[partial][:, None]), axis=-1)
+    return median, mad
+
+
+def _ewma_baseline(grid, span):
+    """Média e desvio exponenciais das ocorrências anteriores (laço apenas sobre as ocorrências)"""
+    alpha = 2 / (span + 1)
+    mean = np.full(grid.shape, np.nan)
+    var = np.full(grid.shape, np.nan)
+    current_mean = grid[:, 0].copy()
+    current_var = np.zeros(grid.shape[0])
+    for column in range(1, grid.shape[1]):
+        mean[:, column] = current_mean
+        var[:, column] = current_var
+        value = grid[:, column]
+        delta = value - current_mean
+        update = ~np.isnan(value)
+        current_mean = np.where(update, current_mean + alpha * delta, current_mean)
+        current_var = np.where(update, (1 - alpha) * (current_var + alpha * delta ** 2), current_var)
+    return mean, np.sqrt(var)
+
+
+def _time_features(df):
+    """Retorna hora do dia e dia da semana, das colunas ou derivados do timestamp"""
+    if 'hour' in df and 'weekday' in df:
+        return df['hour'].to_numpy(dtype=np.int64), df['weekday'].to_numpy(dtype=np.int64)
+    index = pd.DatetimeIndex(df['timestamp'])
+    return index.hour.to_numpy(dtype=np.int64), index.weekday.to_numpy(dtype=np.int64)
+
 
 if __name__ == "__main__":
     analyzer = EnergyAnalyzer()
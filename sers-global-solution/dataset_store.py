@@ -0,0 +1,210 @@
+"""
+SERS Global Solution - Repositório Compartilhado de Conjuntos de Dados
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+
+class DatasetStore:
+    """
+    Repositório de conjuntos de dados em memória, compartilhado por todas as sessões do processo
+
+    Cada conjunto é guardado uma única vez em formato colunar somente leitura
+    (arrays NumPy ou buffers Arrow), ordenado por 'timestamp'. As sessões recebem
+    DataFrames que são fatias desses buffers, sem cópia. Quando o total ultrapassa
+    o orçamento de memória, os conjuntos usados há mais tempo são descartados;
+    fatias já entregues continuam válidas, pois mantêm referência aos buffers.
+    """
+
+    def __init__(self, memory_budget_mb=None):
+        """
+        Inicializa o repositório
+
+        Args:
+            memory_budget_mb (float): Orçamento de memória em MB (padrão: variável de
+                ambiente SERS_DATASET_MEMORY_MB ou 512)
+        """
+        if memory_budget_mb is None:
+            memory_budget_mb = float(os.environ.get('SERS_DATASET_MEMORY_MB', DEFAULT_MEMORY_BUDGET_MB))
+        if memory_budget_mb <= 0:
+            raise ValueError("Orçamento de memória deve ser positivo")
+
+        self.memory_budget = int(memory_budget_mb * 1024 ** 2)
+        self._datasets = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader, start=None, end=None, columns=None):
+        """
+        Retorna uma visão do conjunto, carregando-o uma única vez se necessário
+
+        Args:
+            key (tuple): Identificador do conjunto (ex.: origem e parâmetros de geração)
+            loader (callable): Função sem argumentos que retorna o DataFrame completo
+            start (str): Início da janela de tempo (opcional)
+            end (str): Fim da janela de tempo, não incluído (opcional)
+            columns (list): Colunas desejadas (padrão: todas)
+
+        Returns:
+            pandas.DataFrame: Visão somente leitura do conjunto
+        """
+        dataset = self._lookup(key)
+        if dataset is None:
+            # Um carregamento por chave: sessões simultâneas aguardam o mesmo resultado
+            with self._lock:
+                key_lock = self._loading.setdefault(key, threading.Lock())
+            with key_lock:
+                dataset = self._lookup(key)
+                if dataset is None:
+                    try:
+                        dataset = self._columnar(loader())
+                        self._insert(key, dataset)
+                    finally:
+                        with self._lock:
+                            self.misses += 1
+                            self._loading.pop(key, None)
+
+        return self._view(dataset, start, end, columns)
+
+    def load_parquet(self, path, start=None, end=None, columns=None):
+        """
+        Retorna uma visão de um arquivo Parquet local, lido uma única vez por versão do arquivo
+
+        Args:
+            path (str): Caminho do arquivo Parquet
+            start (str): Início da janela de tempo (opcional)
+            end (str): Fim da janela de tempo, não incluído (opcional)
+            columns (list): Colunas desejadas (padrão: todas)
+
+        Returns:
+            pandas.DataFrame: Visão somente leitura do conjunto
+        """
+        path = os.path.abspath(path)
+        key = ('parquet', path, os.path.getmtime(path))
+        return self.get(key, lambda: pd.read_parquet(path), start, end, columns)
+
+    def evict(self, key=None):
+        """
+        Remove um conjunto do repositório (ou todos, se key não for informado)
+
+        Args:
+            key (tuple): Identificador do conjunto (opcional)
+        """
+        with self._lock:
+            if key is None:
+                self._datasets.clear()
+            else:
+                self._datasets.pop(key, None)
+
+    def memory_usage(self):
+        """
+        Retorna a memória ocupada pelos conjuntos em cache
+
+        Returns:
+            dict: Número de conjuntos, bytes ocupados, orçamento e acertos/faltas de cache
+        """
+        with self._lock:
+            return {
+                'datasets': len(self._datasets),
+                'bytes': sum(dataset['nbytes'] for dataset in self._datasets.values()),
+                'budget_bytes': self.memory_budget,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _lookup(self, key):
+        """Busca um conjunto e o marca como usado mais recentemente"""
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                self._datasets.move_to_end(key)
+                self.hits += 1
+            return dataset
+
+    def _insert(self, key, dataset):
+        """Insere um conjunto descartando os menos usados até caber no orçamento"""
+        with self._lock:
+            self._datasets[key] = dataset
+            self._datasets.move_to_end(key)
+            total = sum(stored['nbytes'] for stored in self._datasets.values())
+            while total > self.memory_budget and len(self._datasets) > 1:
+                _, evicted = self._datasets.popitem(last=False)
+                total -= evicted['nbytes']
+
+    @staticmethod
+    def _columnar(df):
+        """Converte o DataFrame em colunas somente leitura ordenadas por tempo"""
+        if df is None or df.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+        if 'timestamp' in df and not df['timestamp'].is_monotonic_increasing:
+            df = df.sort_values('timestamp', kind='stable')
+
+        columns = {}
+        for column in df.columns:
+            values = df[column].array
+            if isinstance(values.dtype, np.dtype) or values.dtype.kind in 'mM':
+                # Colunas NumPy (inclusive datas) viram arrays imutáveis
+                values = df[column].to_numpy().copy()
+                values.flags.writeable = False
+            columns[column] = values
+
+        timestamps = columns['timestamp'] if 'timestamp' in columns else None
+        return {
+            'columns': columns,
+            'timestamps': timestamps,
+            'nbytes': sum(values.nbytes for values in columns.values())
+        }
+
+    @staticmethod
+    def _view(dataset, start, end, columns):
+        """DataFrame que referencia uma fatia contígua dos buffers do conjunto"""
+        stored = dataset['columns']
+        first_column = next(iter(stored.values()))
+        lower, upper = 0, len(first_column)
+
+        if start is not None or end is not None:
+            timestamps = dataset['timestamps']
+            if timestamps is None:
+                raise ValueError("Conjunto sem coluna 'timestamp' para recorte por período")
+            if start is not None:
+                lower = np.searchsorted(timestamps, np.datetime64(pd.Timestamp(start)), side='left')
+            if end is not None:
+                upper = np.searchsorted(timestamps, np.datetime64(pd.Timestamp(end)), side='left')
+
+        if columns is None:
+            columns = list(stored)
+        missing = [column for column in columns if column not in stored]
+        if missing:
+            raise ValueError(f"Colunas não encontradas no conjunto: {missing}")
+
+        return pd.DataFrame({column: stored[column][lower:upper] for column in columns}, copy=False)
+
+
+if __name__ == "__main__":
+    import time
+
+    from data_analyzer import EnergyAnalyzer
+
+    analyzer = EnergyAnalyzer()
+    store = DatasetStore(memory_budget_mb=64)
+    key = ('simulado', 365, '15min', 0)
+
+    start = time.perf_counter()
+    for session in range(50):
+        view = store.get(key, lambda: analyzer.generate_consumption_data(365, seed=0, freq='15min'),
+                         end=pd.Timestamp('2025-01-01') + pd.Timedelta(days=7 + session % 23))
+    elapsed = time.perf_counter() - start
+
+    full = store.get(key, lambda: None)
+    shared = np.shares_memory(view['consumption_kwh'].to_numpy(), full['consumption_kwh'].to_numpy())
+    print(f"50 sessões atendidas em {elapsed:.2f}s; memória compartilhada: {shared}")
+    print(store.memory_usage())
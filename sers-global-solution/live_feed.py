@@ -0,0 +1,431 @@
+"""
+SERS Global Solution - Módulo de Monitoramento de Medidores ao Vivo
+"""
+
+import os
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+
+class SlidingWindowAggregates:
+    """
+    Classe que mantém agregados de uma janela deslizante de leituras em buffer circular
+
+    Cada leitura entra e sai da janela uma única vez, atualizando somas por hora do
+    dia e por departamento em O(1); o pico de demanda usa uma fila monotônica sobre
+    o total de cada instante (O(1) amortizado). Leituras só saem da janela pelo
+    tempo: o buffer dobra de tamanho quando enche. Nenhuma operação percorre o
+    histórico inteiro.
+    """
+
+    def __init__(self, window_hours=24, interval_minutes=None, capacity=None):
+        """
+        Inicializa a janela deslizante
+
+        Args:
+            window_hours (float): Duração da janela em horas
+            interval_minutes (float): Intervalo de medição dos medidores, em minutos
+                (padrão: inferido dos instantes recebidos)
+            capacity (int): Tamanho inicial do buffer (padrão: 4 leituras por
+                intervalo da janela, para vários medidores)
+        """
+        if window_hours <= 0 or (interval_minutes is not None and interval_minutes <= 0):
+            raise ValueError("Janela e intervalo de medição devem ser positivos")
+
+        self.window_seconds = window_hours * 3600.0
+        self.interval_minutes = interval_minutes
+        if capacity is None:
+            capacity = int(np.ceil(window_hours * 60 / (interval_minutes or 60))) * 4
+        self.capacity = max(int(capacity), 1)
+
+        self._times = np.zeros(capacity)
+        self._values = np.zeros(capacity)
+        self._hours = np.zeros(capacity, dtype=np.int64)
+        self._departments = np.zeros(capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+
+        self._hour_totals = np.zeros(24)
+        self._hour_counts = np.zeros(24, dtype=np.int64)
+        self._department_codes = {}
+        self._department_totals = []
+        self._department_counts = []
+        self._instant_totals = {}
+        self._peak = deque()
+        self._step_seconds = None
+        self.total = 0.0
+        self.latest = None
+        self.readings = 0
+
+    def add(self, timestamp, consumption_kwh, department=None):
+        """
+        Inclui uma leitura e expira as que saíram da janela
+
+        Args:
+            timestamp (datetime): Instante de início do intervalo medido
+            consumption_kwh (float): Energia consumida no intervalo
+            department (str): Departamento do medidor (opcional)
+        """
+        moment = timestamp.timestamp()
+        if self._size == self.capacity:
+            self._grow()
+
+        code = -1
+        if department is not None:
+            code = self._department_codes.get(department)
+            if code is None:
+                code = len(self._department_totals)
+                self._department_codes[department] = code
+                self._department_totals.append(0.0)
+                self._department_counts.append(0)
+            self._department_totals[code] += consumption_kwh
+            self._department_counts[code] += 1
+
+        slot = (self._head + self._size) % self.capacity
+        self._times[slot] = moment
+        self._values[slot] = consumption_kwh
+        self._hours[slot] = timestamp.hour
+        self._departments[slot] = code
+        self._size += 1
+
+        self.total += consumption_kwh
+        self._hour_totals[timestamp.hour] += consumption_kwh
+        self._hour_counts[timestamp.hour] += 1
+
+        # Medidores simultâneos somam-se no mesmo instante, como na análise em lote
+        instant_total = self._instant_totals.get(moment, 0.0) + consumption_kwh
+        self._instant_totals[moment] = instant_total
+        if self._peak and moment < self._peak[-1][0]:
+            # Leitura atrasada: a fila é refeita a partir dos totais por instante
+            self._rebuild_peak()
+        else:
+            # Fila monotônica decrescente: o primeiro elemento é o instante de pico da janela
+            if self._peak and self._peak[-1][0] == moment:
+                self._peak.pop()
+            while self._peak and self._peak[-1][1] <= instant_total:
+                self._peak.pop()
+            self._peak.append((moment, instant_total))
+
+        if self.latest is None or moment > self.latest[0]:
+            if self.latest is not None:
+                step = moment - self.latest[0]
+                self._step_seconds = step if self._step_seconds is None else min(self._step_seconds, step)
+            self.latest = (moment, timestamp, consumption_kwh)
+        self.readings += 1
+
+        cutoff = self.latest[0] - self.window_seconds
+        while self._size and self._times[self._head] <= cutoff:
+            self._expire_oldest()
+        while self._peak and self._peak[0][0] <= cutoff:
+            self._peak.popleft()
+
+    @property
+    def interval_hours(self):
+        """Intervalo de medição em horas: o configurado ou o menor passo entre instantes recebidos"""
+        if self.interval_minutes is not None:
+            return self.interval_minutes / 60.0
+        if self._step_seconds is not None:
+            return self._step_seconds / 3600.0
+        return 1.0
+
+    def snapshot(self):
+        """
+        Retorna os agregados atuais da janela, no formato dos insights do analisador
+
+        Returns:
+            dict: Consumo total, perfil horário, pico, desperdício noturno, consumo
+                fora do expediente e demanda média (kW) por departamento na janela
+        """
+        if self._size == 0:
+            return {'readings': self.readings, 'window_readings': 0}
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hourly = self._hour_totals / self._hour_counts
+        observed = np.flatnonzero(self._hour_counts)
+        peak_hour = int(observed[np.argmax(hourly[observed])])
+        total = self.total if self.total else np.nan
+
+        department_demand = {
+            department: round(self._department_totals[code] / self._department_counts[code] / self.interval_hours, 2)
+            for department, code in self._department_codes.items() if self._department_counts[code]
+        }
+
+        return {
+            'readings': self.readings,
+            'window_readings': self._size,
+            'last_timestamp': self.latest[1],
+            'last_consumption_kwh': round(self.latest[2], 2),
+            'total_consumption': round(self.total, 2),
+            'hourly_consumption': {int(hour): round(float(hourly[hour]), 2) for hour in observed},
+            'peak_hour': peak_hour,
+            'peak_demand_kw': round(self._peak[0][1] / self.interval_hours, 2),
+            'night_waste': round(float(self._hour_totals[0:7].sum() / total * 100), 2),
+            'off_hours_consumption': round(float((self._hour_totals[:8].sum() + self._hour_totals[19:].sum()) / total * 100), 2),
+            'department_demand_kw': department_demand,
+            'highest_consumption_dept': (max(department_demand, key=department_demand.get)
+                                         if department_demand else None)
+        }
+
+    def _expire_oldest(self):
+        """Remove a leitura mais antiga do buffer e desconta-a dos agregados"""
+        head = self._head
+        value = self._values[head]
+        hour = self._hours[head]
+        code = self._departments[head]
+        self._instant_totals.pop(self._times[head], None)
+
+        self.total -= value
+        self._hour_totals[hour] -= value
+        self._hour_counts[hour] -= 1
+        if code >= 0:
+            self._department_totals[code] -= value
+            self._department_counts[code] -= 1
+
+        self._head = (head + 1) % self.capacity
+        self._size -= 1
+
+    def _grow(self):
+        """Dobra o buffer quando todas as leituras ainda estão na janela, sem descartar nenhuma"""
+        order = (self._head + np.arange(self._size)) % self.capacity
+        self.capacity *= 2
+        for name in ('_times', '_values', '_hours', '_departments'):
+            current = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=current.dtype)
+            grown[:self._size] = current[order]
+            setattr(self, name, grown)
+        self._head = 0
+
+    def _rebuild_peak(self):
+        """Refaz a fila monotônica do pico a partir dos totais por instante"""
+        self._peak.clear()
+        for moment in sorted(self._instant_totals):
+            instant_total = self._instant_totals[moment]
+            while self._peak and self._peak[-1][1] <= instant_total:
+                self._peak.pop()
+            self._peak.append((moment, instant_total))
+
+
+class LiveFeed:
+    """
+    Classe que consome um fluxo de leituras de medidores com asyncio em uma thread própria
+
+    Cada leitura é uma linha de texto 'timestamp,consumption_kwh[,department]'
+    (ISO 8601), recebida pela cauda de um arquivo local ou por um socket TCP local.
+    """
+
+    def __init__(self, window_hours=24, interval_minutes=None):
+        """
+        Inicializa o monitoramento
+
+        Args:
+            window_hours (float): Duração da janela deslizante em horas
+            interval_minutes (float): Intervalo de medição dos medidores, em minutos
+                (padrão: inferido dos instantes recebidos)
+        """
+        self.aggregates = SlidingWindowAggregates(window_hours, interval_minutes)
+        self.invalid_lines = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._tasks = []
+
+    def ingest_line(self, line):
+        """
+        Interpreta uma linha do fluxo e atualiza os agregados
+
+        Args:
+            line (str): Linha 'timestamp,consumption_kwh[,department]'
+
+        Returns:
+            bool: True se a leitura foi aceita
+        """
+        fields = line.strip().split(',')
+        try:
+            timestamp = datetime.fromisoformat(fields[0])
+            consumption = float(fields[1])
+        except (IndexError, ValueError):
+            # Cabeçalhos e linhas corrompidas são contabilizados e descartados
+            self.invalid_lines += 1
+            return False
+
+        department = fields[2] if len(fields) > 2 and fields[2] else None
+        with self._lock:
+            self.aggregates.add(timestamp, consumption, department)
+        return True
+
+    def snapshot(self):
+        """
+        Retorna os agregados atuais da janela (seguro para chamadas de outras threads)
+
+        Returns:
+            dict: Agregados da janela deslizante, com o total de linhas inválidas
+        """
+        with self._lock:
+            snapshot = self.aggregates.snapshot()
+        snapshot['invalid_lines'] = self.invalid_lines
+        return snapshot
+
+    async def tail_file(self, path, poll_interval=1.0, from_start=True):
+        """
+        Acompanha um arquivo local e consome cada linha acrescentada
+
+        Args:
+            path (str): Caminho do arquivo de leituras
+            poll_interval (float): Intervalo de verificação de novas linhas, em segundos
+            from_start (bool): Consome também as linhas já existentes no arquivo
+        """
+        while not os.path.exists(path):
+            await asyncio.sleep(poll_interval)
+
+        with open(path, encoding='utf-8') as stream:
+            if not from_start:
+                stream.seek(0, os.SEEK_END)
+            pending = ''
+            while True:
+                chunk = stream.readline()
+                if not chunk:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                pending += chunk
+                # Linhas ainda incompletas aguardam o restante da escrita
+                if pending.endswith('\n'):
+                    self.ingest_line(pending)
+                    pending = ''
+
+    async def serve_socket(self, host='127.0.0.1', port=8765):
+        """
+        Recebe leituras por conexões TCP locais (uma leitura por linha)
+
+        Args:
+            host (str): Endereço de escuta
+            port (int): Porta de escuta
+        """
+        async def handle(reader, writer):
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.ingest_line(line.decode('utf-8'))
+            writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def simulate(self, analyzer, interval_seconds=1.0, freq='h', seed=None):
+        """
+        Consome leituras de um medidor simulado diretamente em memória (para demonstração)
+
+        Args:
+            analyzer (EnergyAnalyzer): Analisador usado para gerar o perfil de consumo
+            interval_seconds (float): Tempo real entre leituras consecutivas
+            freq (str): Intervalo de medição simulado
+            seed (int): Semente aleatória (opcional)
+        """
+        for line in _simulated_lines(analyzer, freq, seed):
+            self.ingest_line(line)
+            await asyncio.sleep(interval_seconds)
+
+    def start(self, *sources):
+        """
+        Inicia o laço de eventos em uma thread de fundo com as fontes informadas
+
+        Args:
+            *sources: Corrotinas de ingestão (ex.: feed.tail_file(path))
+
+        Returns:
+            LiveFeed: O próprio monitoramento, para encadeamento
+        """
+        if self._thread is not None:
+            raise ValueError("Monitoramento já iniciado")
+
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._tasks = [self._loop.create_task(source) for source in sources]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='sers-live-feed', daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """Cancela as fontes e encerra a thread do laço de eventos"""
+        if self._thread is None:
+            return
+
+        async def cancel_sources():
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_sources(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = None
+
+
+async def simulate_meter(path, analyzer, interval_seconds=1.0, freq='h', seed=None):
+    """
+    Escreve leituras simuladas em um arquivo, como um medidor real (para demonstração)
+
+    Args:
+        path (str): Arquivo de leituras a ser acrescentado
+        analyzer (EnergyAnalyzer): Analisador usado para gerar o perfil de consumo
+        interval_seconds (float): Tempo real entre leituras consecutivas
+        freq (str): Intervalo de medição simulado
+        seed (int): Semente aleatória (opcional)
+    """
+    with open(path, 'a', encoding='utf-8') as stream:
+        for line in _simulated_lines(analyzer, freq, seed):
+            stream.write(line)
+            stream.flush()
+            await asyncio.sleep(interval_seconds)
+
+
+def _simulated_lines(analyzer, freq, seed):
+    """Um ano de leituras simuladas no formato do fluxo, uma linha por intervalo"""
+    data = analyzer.generate_consumption_data(365, seed=seed, freq=freq)
+    return (data['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S') + ','
+            + data['consumption_kwh'].astype(str) + ',' + data['department'] + '\n').tolist()
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    from data_analyzer import EnergyAnalyzer
+
+    # Janela de 7 dias sobre um ano de leituras horárias: agregados iguais ao lote
+    analyzer = EnergyAnalyzer()
+    data = analyzer.generate_consumption_data(365, seed=0)
+    aggregates = SlidingWindowAggregates(window_hours=7 * 24)
+
+    start = time.perf_counter()
+    for timestamp, consumption, department in zip(data['timestamp'], data['consumption_kwh'], data['department']):
+        aggregates.add(timestamp, consumption, department)
+    elapsed = time.perf_counter() - start
+    print(f"{len(data)} leituras em {elapsed:.2f}s ({elapsed / len(data) * 1e6:.1f} µs por leitura)")
+
+    batch = analyzer.analyze_consumption_patterns(data.tail(7 * 24))
+    live = aggregates.snapshot()
+    for metric in ('total_consumption', 'peak_hour', 'night_waste', 'off_hours_consumption'):
+        print(f"{metric}: janela={live[metric]} lote={batch[metric]}")
+
+    # Cauda de arquivo alimentada por um medidor simulado
+    path = os.path.join(tempfile.mkdtemp(), 'leituras.csv')
+    feed = LiveFeed()
+    feed.start(feed.tail_file(path, poll_interval=0.05),
+               simulate_meter(path, analyzer, interval_seconds=0.01, seed=1))
+    time.sleep(1)
+    feed.stop()
+    print("Leituras recebidas pela cauda do arquivo:", feed.snapshot()['readings'])
@@ -0,0 +1,204 @@
+"""
+SERS Global Solution - Teste de Carga do Dashboard com Sessões Simultâneas
+"""
+
+import os
+import time
+import random
+import resource
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def current_rss_mb():
+    """
+    Retorna a memória residente atual do processo
+
+    Returns:
+        float: Memória residente em MB (pico do processo onde /proc não existe)
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoadTester:
+    """
+    Classe que simula analistas simultâneos no dashboard com a API de testes do Streamlit
+
+    Cada sessão é um AppTest executado em uma thread própria do mesmo processo,
+    como as sessões de uma única instância do servidor: recursos em
+    st.cache_resource (ex.: repositório de dados) são compartilhados entre elas.
+    """
+
+    def __init__(self, app_path=DEFAULT_APP_PATH, iterations=3, timeout=120, seed=0):
+        """
+        Inicializa o teste de carga
+
+        Args:
+            app_path (str): Caminho do script Streamlit
+            iterations (int): Análises completas executadas por sessão
+            timeout (float): Tempo máximo de cada execução do script, em segundos
+            seed (int): Semente para sortear os parâmetros de cada sessão
+        """
+        if iterations < 1:
+            raise ValueError("Cada sessão deve executar ao menos uma análise")
+
+        self.app_path = app_path
+        self.iterations = iterations
+        self.timeout = timeout
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    def run(self, sessions=10):
+        """
+        Executa as sessões simultaneamente e consolida as métricas
+
+        Args:
+            sessions (int): Número de sessões simultâneas
+
+        Returns:
+            dict: Sessões, execuções, erros, vazão (execuções/s), latências p50/p95/máxima
+                (s) e memória por sessão (MB)
+        """
+        if sessions < 1:
+            raise ValueError("Número de sessões deve ser positivo")
+
+        # Importação tardia: o módulo pode ser usado para relatórios sem o Streamlit
+        from streamlit.testing.v1 import AppTest
+
+        if not self._warmed:
+            # Primeira execução fora da medição: importações e caches do processo
+            AppTest.from_file(self.app_path, default_timeout=self.timeout).run()
+            self._warmed = True
+
+        self._latencies, self._errors, self._apps = [], [], []
+        barrier = threading.Barrier(sessions)
+        baseline_rss = current_rss_mb()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            list(executor.map(lambda session: self._session(AppTest, session, barrier), range(sessions)))
+        elapsed = time.perf_counter() - start
+
+        # Medido com todas as sessões ainda vivas, como em um servidor ocupado
+        session_memory = max(current_rss_mb() - baseline_rss, 0.0) / sessions
+        latencies = np.array(self._latencies)
+        self._apps = []
+
+        return {
+            'sessions': sessions,
+            'reruns': len(latencies),
+            'errors': len(self._errors),
+            'elapsed_s': round(elapsed, 2),
+            'throughput_reruns_per_s': round(len(latencies) / elapsed, 2),
+            'latency_p50_s': round(float(np.percentile(latencies, 50)), 3) if len(latencies) else np.nan,
+            'latency_p95_s': round(float(np.percentile(latencies, 95)), 3) if len(latencies) else np.nan,
+            'latency_max_s': round(float(latencies.max()), 3) if len(latencies) else np.nan,
+            'memory_per_session_mb': round(session_memory, 1),
+            'error_messages': self._errors[:5]
+        }
+
+    def run_series(self, session_counts):
+        """
+        Executa o teste para várias quantidades de sessões (planejamento de capacidade)
+
+        Args:
+            session_counts (list): Quantidades de sessões simultâneas a testar
+
+        Returns:
+            list: Métricas de cada execução, na ordem informada
+        """
+        return [self.run(sessions) for sessions in session_counts]
+
+    def _session(self, app_test_class, session, barrier):
+        """Roteiro de um analista: abre o painel, ajusta a barra lateral e executa a análise"""
+        rng = random.Random(self.seed * 100003 + session)
+        app = app_test_class.from_file(self.app_path, default_timeout=self.timeout)
+        with self._lock:
+            self._apps.append(app)
+
+        # Todas as sessões abrem o painel ao mesmo tempo
+        barrier.wait()
+        self._timed_run(app)
+
+        for _ in range(self.iterations):
+            sliders = {slider.label: slider for slider in app.sidebar.slider}
+            selectboxes = {selectbox.label: selectbox for selectbox in app.sidebar.selectbox}
+
+            days = sliders["Período de Análise (dias)"]
+            days.set_value(rng.randint(days.min, days.max))
+            area = sliders["Área Disponível para Painéis (m²)"]
+            area.set_value(rng.randint(area.min, area.max))
+            for label in ("Estado da Instalação", "Intervalo de Medição"):
+                selectboxes[label].select(rng.choice(selectboxes[label].options))
+
+            app.sidebar.button[0].click()
+            self._timed_run(app)
+
+    def _timed_run(self, app):
+        """Executa o script uma vez registrando latência e erros"""
+        start = time.perf_counter()
+        try:
+            app.run()
+        except Exception as e:
+            with self._lock:
+                self._errors.append(str(e))
+            return
+        latency = time.perf_counter() - start
+
+        with self._lock:
+            self._latencies.append(latency)
+            self._errors.extend(exception.value for exception in app.exception)
+            self._errors.extend(error.value for error in app.error)
+
+
+def format_report(results):
+    """
+    Formata as métricas do teste de carga como tabela de texto
+
+    Args:
+        results (list): Métricas retornadas por LoadTester.run
+
+    Returns:
+        str: Tabela com uma linha por quantidade de sessões
+    """
+    header = f"{'Sessões':>8} {'Execuções':>10} {'Erros':>6} {'Vazão/s':>8} {'p50 (s)':>8} {'p95 (s)':>8} {'Máx (s)':>8} {'MB/sessão':>10}"
+    lines = [header, '-' * len(header)]
+    for result in results:
+        lines.append(
+            f"{result['sessions']:>8} {result['reruns']:>10} {result['errors']:>6} "
+            f"{result['throughput_reruns_per_s']:>8.2f} {result['latency_p50_s']:>8.3f} "
+            f"{result['latency_p95_s']:>8.3f} {result['latency_max_s']:>8.3f} "
+            f"{result['memory_per_session_mb']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Teste de carga do dashboard SERS Global Solution")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10],
+                        help="Quantidades de sessões simultâneas a testar")
+    parser.add_argument('--iterations', type=int, default=3, help="Análises completas por sessão")
+    parser.add_argument('--timeout', type=float, default=120, help="Tempo máximo por execução (s)")
+    parser.add_argument('--app', default=DEFAULT_APP_PATH, help="Caminho do script Streamlit")
+    args = parser.parse_args()
+
+    tester = LoadTester(args.app, iterations=args.iterations, timeout=args.timeout)
+    results = tester.run_series(args.sessions)
+    print(format_report(results))
+    for result in results:
+        for message in result['error_messages']:
+            print(f"[{result['sessions']} sessões] {message}")
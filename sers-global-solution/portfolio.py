@@ -0,0 +1,217 @@
+"""
+SERS Global Solution - Módulo de Resultados de Portfólio
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Seleções filtradas e ordenadas mantidas em memória (compartilhadas entre sessões)
+SELECTION_CACHE_SIZE = 64
+
+
+def generate_portfolio(n_sites, states, seed=None):
+    """
+    Gera um portfólio simulado de sites para a análise em lote
+
+    Args:
+        n_sites (int): Número de sites
+        states (list): Siglas dos estados sorteados para os sites
+        seed (int): Semente aleatória para dados reproduzíveis (opcional)
+
+    Returns:
+        pandas.DataFrame: Um site por linha com 'site_id', 'state', 'available_area'
+            e 'monthly_consumption'
+    """
+    if n_sites < 1:
+        raise ValueError("Portfólio deve ter ao menos um site")
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'site_id': [f'SITE-{number:06d}' for number in range(1, n_sites + 1)],
+        'state': np.array(states, dtype=object)[rng.integers(len(states), size=n_sites)],
+        'available_area': rng.integers(20, 501, size=n_sites),
+        'monthly_consumption': rng.lognormal(8.5, 0.8, size=n_sites).round(2)
+    })
+
+
+class PortfolioResultStore:
+    """
+    Classe de armazenamento colunar dos resultados de um portfólio para consulta paginada
+
+    Cada coluna é um ndarray (colunas de texto codificadas como inteiros) e os
+    índices de ordenação de todas as colunas são calculados uma única vez. Uma
+    consulta combina filtro e ordenação em uma seleção de posições (mantida em
+    cache) e materializa apenas as linhas da página pedida.
+    """
+
+    def __init__(self, results):
+        """
+        Indexa os resultados do portfólio
+
+        Args:
+            results (pandas.DataFrame): Um site por linha (ex.: de calculate_feasibility_batch)
+        """
+        if results is None or results.empty:
+            raise ValueError("DataFrame vazio ou não fornecido")
+
+        self.columns = list(results.columns)
+        self._values = {}
+        self.levels = {}
+        for column in self.columns:
+            values = results[column]
+            if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                self._values[column] = values.to_numpy()
+            else:
+                # Níveis ordenados: a ordem dos códigos é a ordem alfabética dos valores
+                codes, levels = pd.factorize(values, sort=True)
+                self._values[column] = codes
+                self.levels[column] = levels
+
+        # Ordem decrescente pela chave negada: empates mantêm a ordem original e NaN fica no fim
+        self._sort_index = {}
+        for column, values in self._values.items():
+            keys = values.astype(np.int64) if values.dtype == bool else values
+            self._sort_index[column, True] = np.argsort(keys, kind='stable')
+            self._sort_index[column, False] = np.argsort(-keys, kind='stable')
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values[self.columns[0]])
+
+    def page(self, sort_by=None, ascending=True, filters=None, page=0, page_size=50):
+        """
+        Retorna uma página dos resultados filtrados e ordenados
+
+        Args:
+            sort_by (str): Coluna de ordenação (padrão: ordem original)
+            ascending (bool): Ordem crescente
+            filters (dict): Valores aceitos por coluna de texto (lista) ou intervalo
+                (mínimo, máximo) por coluna numérica, ex.: {'state': ['SP'],
+                'payback_years': (None, 5)}
+            page (int): Número da página, a partir de 0
+            page_size (int): Linhas por página
+
+        Returns:
+            tuple: (DataFrame com as linhas da página, total de linhas após o filtro)
+        """
+        if page_size < 1:
+            raise ValueError("Tamanho da página deve ser positivo")
+
+        selection = self._selection(sort_by, ascending, filters)
+        start = page * page_size
+        positions = selection[start:start + page_size]
+
+        columns = {}
+        for column in self.columns:
+            values = self._values[column][positions]
+            columns[column] = self.levels[column][values] if column in self.levels else values
+        return pd.DataFrame(columns), len(selection)
+
+    def summary(self, filters=None, columns=None):
+        """
+        Consolida os resultados filtrados
+
+        Args:
+            filters (dict): Filtros no formato de page()
+            columns (list): Colunas consolidadas (padrão: todas)
+
+        Returns:
+            dict: Número de sites, somas e médias das colunas numéricas e contagem
+                por valor das colunas de texto
+        """
+        selection = self._selection(None, True, filters)
+        summary = {'sites': len(selection)}
+        for column in columns or self.columns:
+            values = self._values[column][selection]
+            if column in self.levels:
+                counts = np.bincount(values, minlength=len(self.levels[column]))
+                summary[column] = dict(zip(self.levels[column], counts.tolist()))
+            elif len(values):
+                summary[column] = {'sum': float(values.sum()), 'mean': float(values.mean())}
+        return summary
+
+    def _selection(self, sort_by, ascending, filters):
+        """Posições filtradas na ordem pedida, calculadas uma vez por combinação"""
+        if sort_by is not None and sort_by not in self._values:
+            raise ValueError(f"Coluna {sort_by} não encontrada")
+
+        key = (sort_by, ascending, _filters_key(filters))
+        with self._lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+
+        if sort_by is None:
+            order = np.arange(len(self))
+            if not ascending:
+                order = order[::-1]
+        else:
+            order = self._sort_index[sort_by, ascending]
+
+        mask = self._mask(filters)
+        selection = order if mask is None else order[mask[order]]
+
+        with self._lock:
+            self._selections[key] = selection
+            if len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return selection
+
+    def _mask(self, filters):
+        """Máscara booleana das linhas aceitas pelos filtros (None sem filtros)"""
+        mask = None
+        for column, accepted in (filters or {}).items():
+            if column not in self._values:
+                raise ValueError(f"Coluna {column} não encontrada")
+            values = self._values[column]
+            if column in self.levels:
+                # Tabela de consulta por código: um acesso por linha, sem comparar textos
+                allowed = np.zeros(len(self.levels[column]), dtype=bool)
+                positions = self.levels[column].get_indexer(pd.Index(list(accepted)))
+                allowed[positions[positions >= 0]] = True
+                column_mask = allowed[values]
+            else:
+                lower, upper = accepted
+                column_mask = np.ones(len(values), dtype=bool)
+                if lower is not None:
+                    column_mask &= values >= lower
+                if upper is not None:
+                    column_mask &= values <= upper
+            mask = column_mask if mask is None else mask & column_mask
+        return mask
+
+
+def _filters_key(filters):
+    """Chave imutável e independente da ordem para os filtros"""
+    if not filters:
+        return ()
+    return tuple(sorted((column, tuple(accepted)) for column, accepted in filters.items()))
+
+
+if __name__ == "__main__":
+    import time
+
+    from solar_simulator import SolarSimulator
+
+    simulator = SolarSimulator()
+    sites = generate_portfolio(50000, list(simulator.irradiation), seed=0)
+
+    start = time.perf_counter()
+    store = PortfolioResultStore(simulator.calculate_feasibility_batch(sites))
+    built = time.perf_counter() - start
+
+    filters = {'state': ['SP', 'MG'], 'payback_years': (None, 5)}
+    start = time.perf_counter()
+    first, total = store.page('roi_25_years', ascending=False, filters=filters)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    store.page('roi_25_years', ascending=False, filters=filters, page=10)
+    cached = time.perf_counter() - start
+
+    print(f"{len(store)} sites calculados e indexados em {built * 1000:.0f} ms")
+    print(f"Primeira página em {elapsed * 1000:.2f} ms; página seguinte em {cached * 1000:.2f} ms ({total} sites filtrados)")
+    print(first.head())
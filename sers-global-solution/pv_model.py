@@ -0,0 +1,296 @@
+"""
+SERS Global Solution - Modelo Físico de Geração Fotovoltaica
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_analyzer import infer_interval_hours
+
+# Clima típico das capitais: temperatura média anual, amplitude sazonal e amplitude diária (°C)
+# e latitude (graus, negativa ao sul)
+STATE_CLIMATE = {
+    'SP': (20.5, 3.5, 4.5, -23.5), 'RJ': (24.0, 3.0, 3.5, -22.9), 'MG': (21.5, 2.5, 5.0, -19.9),
+    'RS': (19.5, 6.0, 4.5, -30.0), 'PR': (17.5, 4.5, 5.0, -25.4), 'SC': (21.0, 4.5, 3.5, -27.6),
+    'BA': (26.0, 1.5, 3.0, -13.0), 'CE': (27.0, 1.0, 3.5, -3.7), 'PE': (26.0, 1.5, 3.5, -8.1),
+    'GO': (24.0, 2.0, 6.0, -16.7), 'DF': (21.5, 2.0, 5.5, -15.8), 'ES': (24.5, 2.5, 3.5, -20.3)
+}
+
+# Céu claro: irradiância extraterrestre (W/m²) e parcela difusa relativa à direta
+SOLAR_CONSTANT = 1353.0
+DIFFUSE_FRACTION = 0.1
+CLEAR_SKY_TRANSMITTANCE = 0.75
+
+# Índice de claridade diário mínimo (dia mais nublado, relativo ao céu claro)
+MIN_CLEARNESS = 0.05
+
+# Ano típico usado nas estimativas anuais (não bissexto, intervalos horários)
+TYPICAL_YEAR = 2025
+
+# Linhas (combinações site x parâmetros) calculadas por bloco de sites x horas
+_CHUNK_ROWS = 256
+
+
+class PVModel:
+    """
+    Classe de modelo físico de geração fotovoltaica calculado em lote (sites x intervalos)
+
+    A irradiância de cada intervalo segue o céu claro no plano dos módulos
+    (inclinados na latitude, voltados para o norte), pela posição do Sol na
+    latitude do estado, escalado por um índice de claridade diário: dias limpos
+    chegam a cerca de 1000 W/m² ao meio-dia e a média anual é a irradiação
+    informada. A potência CC por kWp sofre perda por
+    temperatura da célula (modelo NOCT), sujidade e perdas do sistema; a
+    potência CA é limitada pela capacidade do inversor (razão CC/CA). Sites com
+    os mesmos parâmetros compartilham o mesmo perfil, calculado uma única vez.
+    """
+
+    def __init__(self, temperature_coefficient=-0.0035, noct=45.0, dc_ac_ratio=1.25, inverter_efficiency=0.98,
+                 soiling_loss=0.03, dc_losses=0.02, system_losses=0.07, daily_variability=1.5, seed=0,
+                 climate=None):
+        """
+        Inicializa o modelo com os parâmetros do sistema
+
+        Args:
+            temperature_coefficient (float): Variação da potência por °C acima de 25 °C (1/°C)
+            noct (float): Temperatura nominal de operação da célula (°C)
+            dc_ac_ratio (float): Razão entre a potência dos módulos (kWp) e a do inversor (kW)
+            inverter_efficiency (float): Eficiência de conversão do inversor
+            soiling_loss (float): Fração perdida por sujidade dos módulos
+            dc_losses (float): Fração perdida em cabos CC e descasamento, antes do inversor
+            system_losses (float): Fração perdida em cabos CA e disponibilidade, após o inversor
+            daily_variability (float): Desvio padrão relativo da nebulosidade diária (0 para
+                dias iguais; 1 para dias limpos frequentes e poucos dias muito nublados)
+            seed (int): Semente da sequência de claridade do ano típico
+            climate (dict): Clima e latitude por estado no formato de STATE_CLIMATE (opcional)
+        """
+        if dc_ac_ratio <= 0 or not 0 < inverter_efficiency <= 1:
+            raise ValueError("Razão CC/CA e eficiência do inversor devem ser positivas")
+        if not (0 <= soiling_loss < 1 and 0 <= dc_losses < 1 and 0 <= system_losses < 1):
+            raise ValueError("Perdas devem estar entre 0 e 1")
+
+        self.temperature_coefficient = temperature_coefficient
+        self.noct = noct
+        self.dc_ac_ratio = dc_ac_ratio
+        self.inverter_efficiency = inverter_efficiency
+        self.soiling_loss = soiling_loss
+        self.dc_losses = dc_losses
+        self.system_losses = system_losses
+        self.climate = dict(STATE_CLIMATE if climate is None else climate)
+
+        # Nebulosidade por dia do ano, com média 1: 0 é céu claro; a média anual define o
+        # quanto a irradiação do estado fica abaixo do céu claro
+        if daily_variability > 0:
+            shape = 1 / daily_variability ** 2
+            cloudiness = np.random.default_rng(seed).gamma(shape, 1 / shape, 366)
+            self._cloudiness = cloudiness / cloudiness.mean()
+        else:
+            self._cloudiness = np.ones(366)
+        self._annual = {}
+        self._year_features = None
+        self._clear_daily = None
+
+    def generation_per_kwp(self, timestamps, irradiation, states, dc_ac_ratio=None):
+        """
+        Calcula a geração CA de cada site em cada intervalo, por kWp instalado
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo
+            irradiation (array-like): Irradiação média diária de cada site (kWh/m²/dia)
+            states (array-like): Sigla do estado de cada site (define o clima)
+            dc_ac_ratio (float ou array-like): Razão CC/CA por site (padrão: a do modelo)
+
+        Returns:
+            numpy.ndarray: Geração em kWh/kWp, uma linha por site e uma coluna por intervalo
+        """
+        index = pd.DatetimeIndex(timestamps)
+        rows, inverse = self._unique_rows(irradiation, states, dc_ac_ratio)
+        features = self._interval_features(index)
+        profiles = np.vstack([self._power(*rows[start:start + _CHUNK_ROWS].T, features)[0]
+                              for start in range(0, len(rows), _CHUNK_ROWS)])
+        return profiles[inverse] * infer_interval_hours(index)
+
+    def annual_summary(self, irradiation, states, dc_ac_ratio=None):
+        """
+        Resume um ano típico horário de cada site, sem materializar a matriz sites x horas
+
+        Args:
+            irradiation (array-like): Irradiação média diária de cada site (kWh/m²/dia)
+            states (array-like): Sigla do estado de cada site
+            dc_ac_ratio (float ou array-like): Razão CC/CA por site (padrão: a do modelo)
+
+        Returns:
+            pandas.DataFrame: Por site, produtividade anual (kWh/kWp), taxa de desempenho e
+                perdas percentuais por temperatura e por limitação do inversor
+        """
+        rows, inverse = self._unique_rows(irradiation, states, dc_ac_ratio)
+        summary = np.vstack([self._annual_block(block) for block in
+                             (rows[start:start + _CHUNK_ROWS] for start in range(0, len(rows), _CHUNK_ROWS))])
+        return pd.DataFrame(summary[inverse], columns=['specific_yield', 'performance_ratio',
+                                                       'temperature_loss_pct', 'clipping_loss_pct'])
+
+    def monthly_yield(self, irradiation, states, dc_ac_ratio=None):
+        """
+        Geração mensal média por kWp de cada site em um ano típico
+
+        Args:
+            irradiation (array-like): Irradiação média diária de cada site (kWh/m²/dia)
+            states (array-like): Sigla do estado de cada site
+            dc_ac_ratio (float ou array-like): Razão CC/CA por site (padrão: a do modelo)
+
+        Returns:
+            numpy.ndarray: Geração mensal em kWh/kWp
+        """
+        return self.annual_summary(irradiation, states, dc_ac_ratio)['specific_yield'].to_numpy() / 12
+
+    def _annual_block(self, rows):
+        """Produtividade e perdas anuais de um bloco de combinações, mantidas em cache"""
+        keys = [tuple(row) for row in rows]
+        missing = [key for key in keys if key not in self._annual]
+        if missing:
+            if self._year_features is None:
+                self._year_features = self._interval_features(_typical_year())
+            irradiation, climate, ratio = np.array(missing).T
+            ac, dc, clipped, irradiance = self._power(irradiation, climate, ratio, self._year_features)
+            insolation = irradiance.sum(axis=1) / 1000
+            specific_yield = ac.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                # Perda por temperatura relativa à geração CC que a mesma irradiância daria a 25 °C
+                temperature_loss = 1 - dc.sum(axis=1) / (insolation * (1 - self.soiling_loss) * (1 - self.dc_losses))
+                clipping_loss = clipped.sum(axis=1) / (specific_yield + clipped.sum(axis=1))
+                performance_ratio = specific_yield / insolation
+            for key, values in zip(missing, zip(specific_yield, performance_ratio,
+                                                temperature_loss * 100, clipping_loss * 100)):
+                self._annual[key] = values
+        return np.array([self._annual[key] for key in keys])
+
+    def _power(self, irradiation, climate, dc_ac_ratio, features):
+        """Potência por kWp (linhas x intervalos): CA, CC, parcela limitada pelo inversor e irradiância"""
+        clear_sky, day, seasonal, diurnal = features
+        climate = climate.astype(np.int64)
+        mean, seasonal_amplitude, daily_amplitude, _ = self._climate_table()[climate].T
+
+        # Irradiância no plano dos módulos (W/m²): céu claro do estado x claridade do dia
+        irradiance = clear_sky[climate] * self._daily_clearness(irradiation, climate)[:, day]
+        ambient = mean[:, None] + seasonal_amplitude[:, None] * seasonal + daily_amplitude[:, None] * diurnal
+        cell_temperature = ambient + (self.noct - 20) / 800 * irradiance
+
+        dc = (irradiance / 1000 * (1 + self.temperature_coefficient * (cell_temperature - 25))
+              * (1 - self.soiling_loss) * (1 - self.dc_losses))
+        converted = dc * self.inverter_efficiency
+        limited = np.minimum(converted, (1 / dc_ac_ratio)[:, None])
+        # Perdas CA e indisponibilidade incidem sobre a saída já limitada pelo inversor
+        delivered = 1 - self.system_losses
+        return limited * delivered, dc, (converted - limited) * delivered, irradiance
+
+    def _interval_features(self, index):
+        """Céu claro por estado, dia do ano e ciclos sazonal e diário de temperatura por intervalo"""
+        interval_hours = infer_interval_hours(index)
+        hour = index.hour.to_numpy() + index.minute.to_numpy() / 60 + interval_hours / 2
+        day_of_year = index.dayofyear.to_numpy()
+        latitude = np.radians(self._climate_table()[:, 3])[:, None]
+        clear_sky = _clear_sky_irradiance(latitude, day_of_year, hour)
+        seasonal = np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+        diurnal = np.cos(2 * np.pi * (hour - 15) / 24)
+        return clear_sky, day_of_year - 1, seasonal, diurnal
+
+    def _daily_clearness(self, irradiation, climate):
+        """
+        Índice de claridade de cada combinação em cada dia do ano, limitado ao céu
+        claro e reescalado para que a irradiação média anual seja a informada
+        """
+        if self._clear_daily is None:
+            year = _typical_year()
+            latitude = np.radians(self._climate_table()[:, 3])[:, None]
+            hourly = _clear_sky_irradiance(latitude, year.dayofyear.to_numpy(), year.hour.to_numpy() + 0.5)
+            self._clear_daily = hourly.reshape(len(latitude), -1, 24).sum(axis=2) / 1000
+
+        clear_daily = self._clear_daily[climate]
+        cloudiness = self._cloudiness[:clear_daily.shape[1]]
+
+        # Intensidade da nebulosidade que reproduz a irradiação média (bisseção em lote):
+        # dias sem nuvens continuam no céu claro, só os nublados são atenuados
+        lower = np.zeros(len(irradiation))
+        upper = np.full(len(irradiation), 1 / max(cloudiness.min(), 1e-3))
+        for _ in range(40):
+            middle = (lower + upper) / 2
+            daily = np.clip(1 - middle[:, None] * cloudiness, MIN_CLEARNESS, 1.0)
+            too_dark = (daily * clear_daily).mean(axis=1) < irradiation
+            upper = np.where(too_dark, middle, upper)
+            lower = np.where(too_dark, lower, middle)
+        daily = np.clip(1 - lower[:, None] * cloudiness, MIN_CLEARNESS, 1.0)
+        # Irradiação acima do céu claro ou abaixo do mínimo: ajuste proporcional
+        daily *= (irradiation / (daily * clear_daily).mean(axis=1))[:, None]
+        # Dia 366 (anos bissextos) repete o último dia do ano típico
+        return np.concatenate([daily, daily[:, -1:]], axis=1)
+
+    def _unique_rows(self, irradiation, states, dc_ac_ratio):
+        """Combinações distintas (irradiação, clima, razão CC/CA) e a posição de cada site nelas"""
+        states = np.asarray(states, dtype=object)
+        unknown = sorted(set(states) - set(self.climate))
+        if unknown:
+            raise ValueError(f"Clima não encontrado para os estados: {unknown}")
+
+        codes = pd.Index(list(self.climate)).get_indexer(states)
+        ratio = np.broadcast_to(self.dc_ac_ratio if dc_ac_ratio is None else dc_ac_ratio, len(states))
+        table = np.column_stack([np.broadcast_to(np.asarray(irradiation, dtype=float), len(states)),
+                                 codes, np.asarray(ratio, dtype=float)])
+        return np.unique(table, axis=0, return_inverse=True)
+
+    def _climate_table(self):
+        """Parâmetros de clima na ordem dos códigos de estado"""
+        return np.array(list(self.climate.values()), dtype=float)
+
+
+def _clear_sky_irradiance(latitude, day_of_year, hour):
+    """
+    Irradiância de céu claro (W/m²) no plano dos módulos, uma linha por latitude
+
+    Módulos inclinados na latitude e voltados para o equador recebem o Sol como
+    uma superfície horizontal no equador; a direta normal atenua com a massa de
+    ar (modelo de Meinel) e a difusa é uma fração fixa da direta.
+    """
+    declination = np.radians(23.45) * np.sin(2 * np.pi * (284 + day_of_year) / 365)
+    hour_angle = np.radians(15 * (hour - 12))
+    cos_zenith = (np.sin(latitude) * np.sin(declination)
+                  + np.cos(latitude) * np.cos(declination) * np.cos(hour_angle))
+    cos_incidence = np.clip(np.cos(declination) * np.cos(hour_angle), 0, None)
+
+    daylight = cos_zenith > 0.01
+    air_mass = 1 / np.where(daylight, cos_zenith, 1.0)
+    direct_normal = SOLAR_CONSTANT * CLEAR_SKY_TRANSMITTANCE ** (air_mass ** 0.678)
+    return np.where(daylight, direct_normal * (cos_incidence + DIFFUSE_FRACTION), 0.0)
+
+
+def _typical_year():
+    """Intervalos horários do ano típico"""
+    return pd.date_range(f'{TYPICAL_YEAR}-01-01', f'{TYPICAL_YEAR + 1}-01-01', freq='h', inclusive='left')
+
+
+if __name__ == "__main__":
+    import time
+
+    from solar_simulator import SolarSimulator
+
+    simulator = SolarSimulator()
+    rng = np.random.default_rng(0)
+    states = rng.choice(list(simulator.irradiation), 10000)
+    irradiation = pd.Series(states).map(simulator.irradiation).to_numpy()
+    ratios = rng.choice([1.1, 1.2, 1.3, 1.4], 10000)
+
+    model = PVModel()
+    start = time.perf_counter()
+    summary = model.annual_summary(irradiation, states, ratios)
+    elapsed = time.perf_counter() - start
+    print(f"Ano típico horário de {len(states)} sites em {elapsed * 1000:.0f} ms")
+
+    # Sem perfis compartilhados: cada site com a sua própria razão CC/CA
+    unique_ratios = rng.uniform(1.0, 1.5, 10000)
+    start = time.perf_counter()
+    PVModel().annual_summary(irradiation, states, unique_ratios)
+    elapsed = time.perf_counter() - start
+    print(f"{len(states)} sites x 8760 horas sem perfis compartilhados em {elapsed:.2f}s")
+
+    by_state = summary.assign(state=states, dc_ac_ratio=ratios).groupby(['state', 'dc_ac_ratio']).first()
+    print(by_state.xs(1.2, level='dc_ac_ratio').round(3).to_string())
+    print(by_state.xs('CE', level='state').round(3).to_string())
@@ -0,0 +1,381 @@
+"""
+SERS Global Solution - Módulo de Geração de Relatórios em Lote
+"""
+
+import os
+import re
+import html
+from string import Template
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_analyzer import EnergyAnalyzer
+from solar_simulator import SolarSimulator
+from snapshot import load_snapshot
+from charts import (build_hourly_consumption_figure, build_department_figure,
+                    build_scenarios_figure, build_scenarios_table, cached_figure_json)
+
+# Endereço opcional da Plotly.js; por padrão a biblioteca é embutida e o HTML funciona offline
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Cópia local da Plotly.js gravada uma vez ao lado dos relatórios de um lote
+PLOTLY_BATCH_FILE = "plotly.min.js"
+
+# Templates compilados uma única vez por processo (na importação do módulo)
+_HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>SERS Global Solution - $site_name</title>
+$plotly_script
+<style>
+    body { font-family: Arial, sans-serif; color: #333333; margin: 2rem; }
+    h1 { color: #2c3e50; border-bottom: 2px solid #2c3e50; padding-bottom: 1rem; }
+    h2 { color: #2c3e50; border-bottom: 2px solid #bdc3c7; padding-bottom: 0.5rem; margin-top: 2rem; }
+    .metrics { display: flex; gap: 1rem; flex-wrap: wrap; }
+    .metric-card { background: #f8f9fa; border: 1px solid #dee2e6; border-radius: 6px; padding: 1rem; min-width: 200px; }
+    .metric-label { color: #7f8c8d; font-size: 0.9rem; }
+    .metric-value { color: #2c3e50; font-size: 1.6rem; font-weight: 600; }
+    .recommendation-high { background: #ffebee; border-left: 4px solid #f44336; padding: 1rem; margin: 0.8rem 0; }
+    .recommendation-medium { background: #fff3e0; border-left: 4px solid #ff9800; padding: 1rem; margin: 0.8rem 0; }
+    .recommendation-low { background: #e8f5e8; border-left: 4px solid #4caf50; padding: 1rem; margin: 0.8rem 0; }
+    table { border-collapse: collapse; width: 100%; }
+    th, td { border: 1px solid #dee2e6; padding: 0.5rem; text-align: right; }
+    th { background: #f8f9fa; }
+    .chart { width: 100%; height: 450px; }
+</style>
+</head>
+<body>
+<h1>SERS Global Solution - $site_name</h1>
+<p>Estado: $state | Área disponível: $available_area m² | Período analisado: $days dias</p>
+
+<h2>Resumo Executivo</h2>
+<div class="metrics">
+    <div class="metric-card"><div class="metric-label">Consumo Total</div><div class="metric-value">$total_consumption kWh</div></div>
+    <div class="metric-card"><div class="metric-label">Autossuficiência Solar</div><div class="metric-value">$self_sufficiency%</div></div>
+    <div class="metric-card"><div class="metric-label">Viabilidade</div><div class="metric-value">$classification</div></div>
+    <div class="metric-card"><div class="metric-label">Economia Anual</div><div class="metric-value">R$$ $annual_savings</div></div>
+</div>
+
+<h2>Análise de Consumo</h2>
+<div class="metrics">
+    <div class="metric-card"><div class="metric-label">Horário de Pico</div><div class="metric-value">${peak_hour}h</div></div>
+    <div class="metric-card"><div class="metric-label">Desperdício Noturno</div><div class="metric-value">$night_waste%</div></div>
+    <div class="metric-card"><div class="metric-label">Consumo Fora do Expediente</div><div class="metric-value">$off_hours_consumption%</div></div>
+    <div class="metric-card"><div class="metric-label">Maior Consumo</div><div class="metric-value">$highest_consumption_dept</div></div>
+</div>
+<div id="chart-hourly" class="chart"></div>
+<div id="chart-department" class="chart"></div>
+
+<h2>Energia Solar</h2>
+<p><strong>$classification</strong> - $classification_recommendation</p>
+<table>
+    <tr><th>Potência Instalável</th><th>Geração Mensal</th><th>Investimento Total</th><th>Payback</th><th>ROI (25 anos)</th><th>Redução de CO₂</th></tr>
+    <tr><td>$installed_power kWp</td><td>$monthly_generation kWh</td><td>R$$ $total_investment</td><td>$payback_years anos</td><td>$roi_25_years%</td><td>$co2_reduction ton/ano</td></tr>
+</table>
+
+<h2>Recomendações</h2>
+$recommendations
+
+<h2>Cenários</h2>
+$scenarios_table
+<div id="chart-scenarios" class="chart"></div>
+
+<script>
+    Plotly.newPlot('chart-hourly', $hourly_figure);
+    Plotly.newPlot('chart-department', $department_figure);
+    Plotly.newPlot('chart-scenarios', $scenarios_figure);
+</script>
+</body>
+</html>
+""")
+
+_RECOMMENDATION_TEMPLATE = Template("""<div class="recommendation-$css_priority">
+    <strong>$priority_text: $title</strong>
+    <p>$description</p>
+    <em>Economia estimada: $estimated_savings</em>
+</div>""")
+
+_PRIORITY_TEXT = {
+    'HIGH': 'Alta Prioridade',
+    'MEDIUM': 'Média Prioridade',
+    'LOW': 'Baixa Prioridade'
+}
+
+# Instância do gerador usada por cada processo de trabalho
+_worker_generator = None
+
+# Plotly.js embutida, lida uma única vez por processo
+_plotly_bundle = None
+
+
+def run_site_analysis(analyzer, solar_simulator, site):
+    """
+    Executa a análise completa de um site, na mesma sequência do dashboard
+
+    Args:
+        analyzer (EnergyAnalyzer): Analisador de consumo
+        solar_simulator (SolarSimulator): Simulador solar
+        site (dict): Parâmetros do site (site_id, days, state, available_area, seed)
+
+    Returns:
+        dict: Resultados completos da análise
+    """
+    consumption_data = analyzer.generate_consumption_data(site.get('days', 7), seed=site.get('seed'))
+    consumption_insights = analyzer.analyze_consumption_patterns(consumption_data)
+    anomalies = analyzer.detect_anomalies(consumption_data)
+    recommendations = analyzer.generate_recommendations(consumption_insights, anomalies)
+
+    solar_simulation = solar_simulator.calculate_feasibility(
+        consumption_insights['total_consumption'], site['state'], site.get('available_area', 50)
+    )
+    classification = solar_simulator.classify_feasibility(solar_simulation)
+    scenarios = solar_simulator.generate_comparative_scenarios(
+        consumption_insights['total_consumption'], site['state']
+    )
+
+    return {
+        'site': site,
+        'consumption_data': consumption_data,
+        'consumption_insights': consumption_insights,
+        'recommendations': recommendations,
+        'solar_simulation': solar_simulation,
+        'classification': classification,
+        'scenarios': scenarios
+    }
+
+
+class ReportGenerator:
+    """
+    Classe para geração de relatórios estáticos (HTML ou XLSX) em lote
+    """
+
+    def __init__(self, output_dir='relatorios', max_workers=None, plotly_js_url=None):
+        """
+        Inicializa o gerador de relatórios
+
+        Args:
+            output_dir (str): Diretório de saída dos relatórios
+            max_workers (int): Número de processos de trabalho (padrão: núcleos da CPU)
+            plotly_js_url (str): Endereço da Plotly.js referenciada no HTML (ex.: PLOTLY_CDN);
+                sem ele um relatório avulso embute a biblioteca e um lote a grava
+                uma única vez no diretório de saída (padrão)
+        """
+        self.output_dir = output_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.plotly_js_url = plotly_js_url
+        self.analyzer = EnergyAnalyzer()
+        self.solar_simulator = SolarSimulator()
+
+    def render_html(self, results):
+        """
+        Renderiza os resultados de um site como HTML autônomo
+
+        Args:
+            results (dict): Resultados retornados por run_site_analysis
+
+        Returns:
+            str: Documento HTML
+        """
+        site = results['site']
+        insights = results['consumption_insights']
+        simulation = results['solar_simulation']
+        classification = results['classification']
+        scenarios = results['scenarios']
+
+        recommendations_html = "\n".join(
+            _RECOMMENDATION_TEMPLATE.substitute(
+                css_priority=rec['priority'].lower(),
+                priority_text=_PRIORITY_TEXT.get(rec['priority'], rec['priority']),
+                title=html.escape(rec['title']),
+                description=html.escape(rec['description']),
+                estimated_savings=html.escape(rec['estimated_savings'])
+            )
+            for rec in results['recommendations']
+        ) or "<p>Nenhuma recomendação crítica.</p>"
+
+        scenarios_table = pd.DataFrame(build_scenarios_table(scenarios)).to_html(index=False, border=0)
+
+        return _HTML_TEMPLATE.substitute(
+            site_name=html.escape(str(site.get('name', site.get('site_id', '')))),
+            plotly_script=self._plotly_script(),
+            state=site['state'],
+            available_area=simulation['available_area'],
+            days=site.get('days', 7),
+            total_consumption=f"{insights['total_consumption']:,.0f}",
+            self_sufficiency=simulation['self_sufficiency'],
+            classification=classification['classification'],
+            classification_recommendation=classification['recommendation'],
+            annual_savings=f"{simulation['monthly_savings'] * 12:,.0f}",
+            peak_hour=insights['peak_hour'],
+            night_waste=insights['night_waste'],
+            off_hours_consumption=insights['off_hours_consumption'],
+            highest_consumption_dept=html.escape(str(insights['highest_consumption_dept'])),
+            installed_power=simulation['installed_power'],
+            monthly_generation=f"{simulation['monthly_generation']:,.0f}",
+            total_investment=f"{simulation['total_investment']:,.2f}",
+            payback_years=simulation['payback_years'],
+            roi_25_years=simulation['roi_25_years'],
+            co2_reduction=simulation['co2_reduction'],
+            recommendations=recommendations_html,
+            scenarios_table=scenarios_table,
+            hourly_figure=cached_figure_json(build_hourly_consumption_figure, insights['hourly_consumption']),
+            department_figure=cached_figure_json(build_department_figure, insights['department_totals']),
+            scenarios_figure=cached_figure_json(build_scenarios_figure, scenarios)
+        )
+
+    def _plotly_script(self):
+        """Tag de script da Plotly.js: referência externa ou biblioteca embutida"""
+        if self.plotly_js_url:
+            return f'<script src="{html.escape(self.plotly_js_url)}"></script>'
+        return f'<script type="text/javascript">{plotly_bundle()}</script>'
+
+    def render_xlsx(self, results, path):
+        """
+        Grava os resultados de um site em uma planilha XLSX
+
+        Args:
+            results (dict): Resultados retornados por run_site_analysis
+            path (str): Caminho do arquivo de saída
+        """
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise ImportError("Exportação XLSX requer o pacote openpyxl (pip install openpyxl)")
+
+        insights = results['consumption_insights']
+        simulation = results['solar_simulation']
+
+        summary = {key: value for key, value in insights.items() if not isinstance(value, dict)}
+        summary.update({f'solar_{key}': value for key, value in simulation.items()})
+        summary['classification'] = results['classification']['classification']
+
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            pd.DataFrame(list(summary.items()), columns=['Indicador', 'Valor']).to_excel(
+                writer, sheet_name='Resumo', index=False)
+            pd.Series(insights['hourly_consumption'], name='consumption_kwh').rename_axis('hour').to_excel(
+                writer, sheet_name='Consumo por Hora')
+            pd.Series(insights['department_totals'], name='consumption_kwh').rename_axis('department').to_excel(
+                writer, sheet_name='Consumo por Departamento')
+            pd.DataFrame(results['recommendations']).to_excel(
+                writer, sheet_name='Recomendações', index=False)
+            pd.DataFrame(build_scenarios_table(results['scenarios'])).to_excel(
+                writer, sheet_name='Cenários', index=False)
+
+    def generate_report(self, site, fmt='html'):
+        """
+        Executa a análise de um site e grava o relatório
+
+        Um caminho de snapshot (.sers) pode substituir os parâmetros do site: a
+        análise gravada por uma etapa anterior é reaproveitada sem ser refeita.
+
+        Args:
+            site (dict ou str): Parâmetros do site (site_id, days, state, available_area,
+                seed) ou caminho de um snapshot de análise
+            fmt (str): Formato de saída ('html' ou 'xlsx')
+
+        Returns:
+            str: Caminho do relatório gerado
+        """
+        if fmt not in ('html', 'xlsx'):
+            raise ValueError(f"Formato {fmt} não suportado")
+
+        if isinstance(site, str):
+            # O snapshot é lido sob demanda: o mapeamento fica aberto só durante a escrita
+            with load_snapshot(site) as results:
+                return self._write_report(results, results['site'], fmt)
+        return self._write_report(run_site_analysis(self.analyzer, self.solar_simulator, site), site, fmt)
+
+    def _write_report(self, results, site, fmt):
+        """Grava o relatório de uma análise no diretório de saída e retorna o caminho"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', str(site.get('site_id', site['state'])))
+        path = os.path.join(self.output_dir, f"relatorio_{safe_id}.{fmt}")
+
+        if fmt == 'html':
+            with open(path, 'w', encoding='utf-8') as report_file:
+                report_file.write(self.render_html(results))
+        else:
+            self.render_xlsx(results, path)
+
+        return path
+
+    def generate_batch(self, sites, fmt='html'):
+        """
+        Gera relatórios para um lote de sites em processos paralelos
+
+        Sem plotly_js_url, os relatórios HTML compartilham o arquivo plotly.min.js
+        gravado no diretório de saída em vez de embutir a biblioteca cada um.
+
+        Args:
+            sites (list): Lista de parâmetros dos sites ou de caminhos de snapshots
+            fmt (str): Formato de saída ('html' ou 'xlsx')
+
+        Returns:
+            list: Caminhos dos relatórios gerados, na ordem dos sites
+        """
+        if not sites:
+            return []
+
+        plotly_js_url = self.plotly_js_url
+        if fmt == 'html' and not plotly_js_url:
+            # Uma só cópia da biblioteca para o lote inteiro, referenciada pelo caminho
+            # relativo: os relatórios continuam abrindo offline junto com o diretório
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, PLOTLY_BATCH_FILE), 'w', encoding='utf-8') as js_file:
+                js_file.write(plotly_bundle())
+            plotly_js_url = PLOTLY_BATCH_FILE
+
+        workers = min(self.max_workers, len(sites))
+        if workers == 1:
+            generator = ReportGenerator(self.output_dir, max_workers=1, plotly_js_url=plotly_js_url)
+            return [generator.generate_report(site, fmt) for site in sites]
+
+        # Lotes maiores reduzem o custo de comunicação entre processos
+        chunksize = max(1, len(sites) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.output_dir, plotly_js_url)) as executor:
+            return list(executor.map(_generate_in_worker, sites, [fmt] * len(sites),
+                                     chunksize=chunksize))
+
+
+def plotly_bundle():
+    """
+    Retorna o código da Plotly.js instalada com o pacote plotly, lido uma vez por processo
+
+    Returns:
+        str: Código JavaScript da biblioteca
+    """
+    global _plotly_bundle
+    if _plotly_bundle is None:
+        from plotly.offline import get_plotlyjs
+        _plotly_bundle = get_plotlyjs()
+    return _plotly_bundle
+
+
+def _init_worker(output_dir, plotly_js_url):
+    """Cria o gerador reutilizado por todas as tarefas do processo"""
+    global _worker_generator
+    _worker_generator = ReportGenerator(output_dir, max_workers=1, plotly_js_url=plotly_js_url)
+
+
+def _generate_in_worker(site, fmt):
+    """Gera o relatório de um site dentro de um processo de trabalho"""
+    return _worker_generator.generate_report(site, fmt)
+
+
+if __name__ == "__main__":
+    import time
+
+    states = list(SolarSimulator().irradiation.keys())
+    sites = [
+        {'site_id': f'site_{i:04d}', 'days': 7, 'state': states[i % len(states)],
+         'available_area': 50, 'seed': i}
+        for i in range(100)
+    ]
+
+    start = time.perf_counter()
+    paths = ReportGenerator().generate_batch(sites)
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} relatórios em {elapsed:.1f}s ({len(paths) / elapsed * 60:.0f} relatórios/min)")
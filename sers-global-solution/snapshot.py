@@ -0,0 +1,236 @@
+"""
+SERS Global Solution - Módulo de Snapshots de Análise
+"""
+
+import os
+import json
+import struct
+from collections.abc import Mapping
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Arquivo: assinatura, tamanho do cabeçalho JSON, cabeçalho e blocos Parquet
+SNAPSHOT_MAGIC = b'SERSSNP1'
+SNAPSHOT_VERSION = 1
+_HEADER_SIZE = struct.Struct('<Q')
+
+
+def save_snapshot(path, results, compression='zstd'):
+    """
+    Grava uma análise completa em um único arquivo
+
+    Args:
+        path (str): Caminho do arquivo de snapshot
+        results (dict): Resultados da análise (como os de run_site_analysis)
+        compression (str): Compressão dos blocos Parquet
+
+    Returns:
+        str: Caminho do arquivo gravado
+    """
+    content = dump_snapshot(results, compression)
+    # Gravação atômica: etapas seguintes de um lote nunca leem um arquivo parcial
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as snapshot_file:
+        snapshot_file.write(content)
+    os.replace(temporary_path, path)
+    return path
+
+
+def dump_snapshot(results, compression='zstd'):
+    """
+    Serializa uma análise completa no formato de snapshot
+
+    DataFrames de primeiro nível (ex.: 'consumption_data') são gravados como
+    blocos Parquet independentes; os demais resultados vão para um cabeçalho
+    JSON compacto.
+
+    Args:
+        results (dict): Resultados da análise (como os de run_site_analysis)
+        compression (str): Compressão dos blocos Parquet
+
+    Returns:
+        bytes: Conteúdo do snapshot
+    """
+    pa, pq = _require_pyarrow()
+
+    metadata, blobs, frames = {}, [], {}
+    offset = 0
+    for name, value in results.items():
+        if isinstance(value, pd.DataFrame):
+            sink = pa.BufferOutputStream()
+            pq.write_table(pa.Table.from_pandas(value, preserve_index=False), sink, compression=compression)
+            blob = sink.getvalue().to_pybytes()
+            frames[name] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+        else:
+            metadata[name] = _encode(value)
+
+    header = json.dumps({
+        'version': SNAPSHOT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'metadata': metadata,
+        'frames': frames
+    }, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    return b''.join([SNAPSHOT_MAGIC, _HEADER_SIZE.pack(len(header)), header] + blobs)
+
+
+def load_snapshot(source):
+    """
+    Abre um snapshot lendo apenas o cabeçalho; os DataFrames são lidos sob demanda
+
+    Args:
+        source (str ou bytes): Caminho do arquivo ou conteúdo do snapshot (ex.: upload)
+
+    Returns:
+        Snapshot: Resultados da análise, acessíveis como um dicionário
+    """
+    return Snapshot(source)
+
+
+class Snapshot(Mapping):
+    """
+    Classe de acesso somente leitura a um snapshot de análise
+
+    O arquivo é mapeado em memória (ou lido de bytes já carregados); cada DataFrame é decodificado do seu bloco
+    Parquet apenas no primeiro acesso e mantido em cache.
+    """
+
+    def __init__(self, source):
+        """
+        Abre o snapshot e interpreta o cabeçalho
+
+        Args:
+            source (str ou bytes): Caminho do arquivo ou conteúdo do snapshot
+        """
+        pa, _ = _require_pyarrow()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.path = None
+            self._source = pa.BufferReader(pa.py_buffer(source))
+        else:
+            self.path = source
+            self._source = pa.memory_map(source, 'r')
+
+        prefix = self._source.read(len(SNAPSHOT_MAGIC) + _HEADER_SIZE.size)
+        if prefix[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            self._source.close()
+            raise ValueError("Conteúdo informado não é um snapshot SERS")
+        (header_size,) = _HEADER_SIZE.unpack(prefix[len(SNAPSHOT_MAGIC):])
+
+        header = json.loads(self._source.read(header_size), object_hook=_decode)
+        if header['version'] > SNAPSHOT_VERSION:
+            self._source.close()
+            raise ValueError(f"Versão de snapshot {header['version']} não suportada")
+
+        self.created_at = header['created_at']
+        self._metadata = header['metadata']
+        self._frames = header['frames']
+        self._data_start = len(prefix) + header_size
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        if name in self._metadata:
+            return self._metadata[name]
+        if name not in self._frames:
+            raise KeyError(name)
+        if name not in self._loaded:
+            pa, pq = _require_pyarrow()
+            offset, length = self._frames[name]
+            # Buffer sobre o mapeamento do arquivo, sem cópia dos bytes
+            self._source.seek(self._data_start + offset)
+            buffer = self._source.read_buffer(length)
+            self._loaded[name] = pq.read_table(pa.BufferReader(buffer)).to_pandas()
+        return self._loaded[name]
+
+    def __iter__(self):
+        yield from self._metadata
+        yield from self._frames
+
+    def __len__(self):
+        return len(self._metadata) + len(self._frames)
+
+    def frame_names(self):
+        """
+        Retorna os nomes dos DataFrames gravados no snapshot
+
+        Returns:
+            list: Nomes dos DataFrames
+        """
+        return list(self._frames)
+
+    def close(self):
+        """Libera o mapeamento do arquivo"""
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _require_pyarrow():
+    """Importa o pyarrow, dependência opcional usada pelos snapshots"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Snapshots requerem o pacote pyarrow (pip install pyarrow)")
+    return pa, pq
+
+
+def _encode(value):
+    """Converte resultados em estruturas compatíveis com JSON, preservando tipos de chave e data"""
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: _encode(item) for key, item in value.items()}
+        return {'__items__': [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return {'__timestamp__': value.isoformat()}
+    if isinstance(value, np.ndarray):
+        return {'__array__': _encode(value.tolist()), 'dtype': str(value.dtype)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        raise ValueError("DataFrames só podem ser gravados no primeiro nível dos resultados")
+    return value
+
+
+def _decode(obj):
+    """Reconstrói os tipos convertidos por _encode ao ler o cabeçalho"""
+    if '__items__' in obj:
+        return {(tuple(key) if isinstance(key, list) else key): item for key, item in obj['__items__']}
+    if '__timestamp__' in obj:
+        return pd.Timestamp(obj['__timestamp__'])
+    if '__array__' in obj:
+        return np.array(obj['__array__'], dtype=obj['dtype'])
+    return obj
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    from report_generator import run_site_analysis
+    from data_analyzer import EnergyAnalyzer
+    from solar_simulator import SolarSimulator
+
+    site = {'site_id': 'demo', 'days': 30, 'state': 'SP', 'available_area': 80, 'seed': 7}
+    results = run_site_analysis(EnergyAnalyzer(), SolarSimulator(), site)
+
+    path = os.path.join(tempfile.mkdtemp(), 'analise.sers')
+    save_snapshot(path, results)
+
+    start = time.perf_counter()
+    with load_snapshot(path) as snapshot:
+        restored = dict(snapshot)
+    elapsed = time.perf_counter() - start
+
+    print(f"Snapshot de {os.path.getsize(path) / 1024:.1f} KB restaurado em {elapsed * 1000:.1f} ms")
+    print("Insights idênticos:", restored['consumption_insights'] == results['consumption_insights'])
+    print("Dados idênticos:", restored['consumption_data'].equals(results['consumption_data']))
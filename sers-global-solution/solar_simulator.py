@@ -2,15 +2,25 @@
 SERS Global Solution - Módulo de Simulação de Energia Solar
 """
 
+import numpy as np
 import pandas as pd
 
+from data_analyzer import infer_interval_hours
+
 class SolarSimulator:
     """
     Classe para simulação de viabilidade de energia solar fotovoltaica
     """
     
-    def __init__(self):
-        """Inicializa o simulador com dados de irradiação solar"""
+    def __init__(self, pv_model=None):
+        """
+        Inicializa o simulador com dados de irradiação solar
+        
+        Args:
+            pv_model (PVModel): Modelo físico de geração; sem ele usa a taxa de desempenho
+                fixa (opcional)
+        """
+        self.pv_model = pv_model
         self.irradiation = {
             'SP': 4.5, 'RJ': 4.8, 'MG': 5.2, 'RS': 4.2, 'PR': 4.6,
             'SC': 4.3, 'BA': 5.5, 'CE': 5.8, 'PE': 5.6, 'GO': 5.3,
@@ -20,8 +30,54 @@ class SolarSimulator:
         self.cost_per_kwp = 4500
         self.energy_tariff = 0.80
         self.co2_emission_factor = 0.5
+        self.panel_efficiency = 0.15
+        self.performance_ratio = 0.75
     
-    def calculate_feasibility(self, monthly_consumption, state, available_area=50, cost_kwp=None):
+    def hourly_generation_profile(self, timestamps, state, installed_power):
+        """
+        Distribui a geração diária ao longo do dia (curva solar entre 6h e 18h)
+        
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo
+            state (str): Sigla do estado brasileiro
+            installed_power (float): Potência instalada em kWp
+            
+        Returns:
+            numpy.ndarray: Geração em kWh por intervalo
+        """
+        if state not in self.irradiation:
+            raise ValueError(f"Estado {state} não encontrado")
+        
+        index = pd.DatetimeIndex(timestamps)
+        if self.pv_model is not None:
+            return installed_power * self.pv_model.generation_per_kwp(index, [self.irradiation[state]], [state])[0]
+        
+        interval_hours = infer_interval_hours(index)
+        
+        daily_generation = installed_power * self.irradiation[state] * self.performance_ratio
+        
+        # Potência no ponto médio do intervalo; a integral do seno em 12h vale 24/pi
+        solar_hour = index.hour.to_numpy() + index.minute.to_numpy() / 60 + interval_hours / 2
+        shape = np.clip(np.sin(np.pi * (solar_hour - 6) / 12), 0, None)
+        return daily_generation * (np.pi / 24) * shape * interval_hours
+    
+    def monthly_yield(self, states):
+        """
+        Geração mensal por kWp instalado em cada estado
+        
+        Args:
+            states (array-like): Siglas dos estados
+            
+        Returns:
+            numpy.ndarray: Geração mensal em kWh/kWp
+        """
+        irradiation = pd.Series(states).map(self.irradiation).to_numpy(dtype=float)
+        if self.pv_model is not None:
+            return self.pv_model.monthly_yield(irradiation, states)
+        return irradiation * 30 * self.performance_ratio
+    
+    def calculate_feasibility(self, monthly_consumption, state, available_area=50, cost_kwp=None,
+                              consumption_data=None, tariff=None, carbon=None):
         """
         Calcula viabilidade de instalação de sistema solar
         
@@ -30,6 +86,9 @@ class SolarSimulator:
             state (str): Sigla do estado brasileiro
             available_area (float): Área disponível em m²
             cost_kwp (float): Custo por kWp (opcional)
+            consumption_data (pandas.DataFrame): Consumo por intervalo, usado com a tarifa (opcional)
+            tariff (TariffEngine): Tarifa horo-sazonal; sem ela usa a tarifa única (opcional)
+            carbon (CarbonEngine): Fatores de emissão horários; sem ele usa o fator fixo (opcional)
             
         Returns:
             dict: Resultados da simulação
@@ -45,23 +104,30 @@ class SolarSimulator:
         
         state_irradiation = self.irradiation[state]
         
-        panel_efficiency = 0.15
-        installed_power = available_area * panel_efficiency
+        installed_power = available_area * self.panel_efficiency
         
-        performance_ratio = 0.75
-        monthly_generation = (installed_power * state_irradiation * 30 * performance_ratio)
+        monthly_generation = installed_power * float(self.monthly_yield([state])[0])
         
         self_sufficiency = min(100, (monthly_generation / monthly_consumption) * 100)
         
         total_investment = installed_power * cost_kwp
-        monthly_savings = monthly_generation * self.energy_tariff
+        
+        tariff_details = None
+        if tariff is not None and consumption_data is not None:
+            tariff_details = self._tariff_savings(consumption_data, state, installed_power, tariff)
+            monthly_savings = tariff_details['monthly_savings']
+        else:
+            monthly_savings = monthly_generation * self.energy_tariff
         
         if monthly_savings > 0:
             payback_years = total_investment / (monthly_savings * 12)
         else:
             payback_years = float('inf')
         
-        co2_reduction = (monthly_generation * 12 * self.co2_emission_factor) / 1000
+        if carbon is not None:
+            co2_reduction = self._hourly_co2_reduction(state, installed_power, carbon)
+        else:
+            co2_reduction = (monthly_generation * 12 * self.co2_emission_factor) / 1000
         
         lifespan_years = 25
         total_savings = monthly_savings * 12 * lifespan_years
@@ -82,24 +148,72 @@ class SolarSimulator:
             'lifespan_years': lifespan_years
         }
         
+        if tariff_details is not None:
+            results['tariff_model'] = 'horo-sazonal'
+            results['monthly_cost_before'] = round(tariff_details['monthly_cost_before'], 2)
+            results['monthly_cost_after'] = round(tariff_details['monthly_cost_after'], 2)
+        
         return results
     
-    def generate_comparative_scenarios(self, monthly_consumption, state):
+    def _tariff_savings(self, consumption_data, state, installed_power, tariff):
+        """
+        Calcula a economia mensal com a tarifa horo-sazonal sobre o consumo por intervalo
+        
+        Args:
+            consumption_data (pandas.DataFrame): DataFrame com 'timestamp' e 'consumption_kwh'
+            state (str): Sigla do estado
+            installed_power (float): Potência instalada em kWp
+            tariff (TariffEngine): Motor tarifário
+            
+        Returns:
+            dict: Custos mensais antes e depois da geração e economia mensal
+        """
+        load = consumption_data.groupby('timestamp', sort=True)['consumption_kwh'].sum()
+        generation = self.hourly_generation_profile(load.index, state, installed_power)
+        savings = tariff.calculate_savings(load.index, load.to_numpy(), generation)
+        
+        # Normaliza o período analisado para um mês de calendário
+        months_covered = savings['coverage'].sum()
+        return {
+            'monthly_cost_before': savings['cost_before'].sum() / months_covered,
+            'monthly_cost_after': savings['cost_after'].sum() / months_covered,
+            'monthly_savings': savings['savings'].sum() / months_covered
+        }
+    
+    def _hourly_co2_reduction(self, state, installed_power, carbon):
+        """
+        Calcula a redução anual de CO₂ (t) com fatores de emissão horários em um ano típico
+        
+        Args:
+            state (str): Sigla do estado
+            installed_power (float): Potência instalada em kWp
+            carbon (CarbonEngine): Motor de carbono
+            
+        Returns:
+            float: Emissões evitadas em toneladas de CO₂ por ano
+        """
+        year = carbon.start.year
+        timestamps = pd.date_range(f'{year}-01-01', f'{year + 1}-01-01', freq='h', inclusive='left')
+        generation = self.hourly_generation_profile(timestamps, state, installed_power)
+        return carbon.avoided_emissions(timestamps, generation)['annual'].sum() / 1000
+    
+    def generate_comparative_scenarios(self, monthly_consumption, state, **kwargs):
         """
         Gera diferentes cenários de instalação solar
         
         Args:
             monthly_consumption (float): Consumo mensal em kWh
             state (str): Sigla do estado
+            **kwargs: Parâmetros adicionais repassados a calculate_feasibility
             
         Returns:
             dict: Dicionário com múltiplos cenários
         """
         scenarios = {
-            'pequeno': self.calculate_feasibility(monthly_consumption, state, 25),
-            'medio': self.calculate_feasibility(monthly_consumption, state, 50),
-            'grande': self.calculate_feasibility(monthly_consumption, state, 100),
-            'maximo': self.calculate_feasibility(monthly_consumption, state, 200)
+            'pequeno': self.calculate_feasibility(monthly_consumption, state, 25, **kwargs),
+            'medio': self.calculate_feasibility(monthly_consumption, state, 50, **kwargs),
+            'grande': self.calculate_feasibility(monthly_consumption, state, 100, **kwargs),
+            'maximo': self.calculate_feasibility(monthly_consumption, state, 200, **kwargs)
         }
         
         return scenarios
@@ -143,6 +257,64 @@ class SolarSimulator:
             'self_sufficiency': self_sufficiency
         }
 
+    def calculate_feasibility_batch(self, sites, cost_kwp=None):
+        """
+        Calcula e classifica a viabilidade solar de um portfólio de sites de uma só vez
+
+        Mesmas fórmulas de calculate_feasibility e classify_feasibility com a tarifa
+        única e o fator de emissão fixo, aplicadas em arrays (sem laço por site).
+        Com o modelo físico, sites do mesmo estado compartilham um único perfil anual.
+
+        Args:
+            sites (pandas.DataFrame): Um site por linha com 'monthly_consumption',
+                'state' e 'available_area'
+            cost_kwp (float): Custo por kWp (opcional)
+
+        Returns:
+            pandas.DataFrame: Colunas de entrada acrescidas dos resultados e da classificação
+        """
+        unknown = sorted(set(sites['state']) - set(self.irradiation))
+        if unknown:
+            raise ValueError(f"Estados não encontrados: {unknown}")
+
+        monthly_consumption = sites['monthly_consumption'].to_numpy(dtype=float)
+        if (monthly_consumption <= 0).any():
+            raise ValueError("Consumo mensal deve ser maior que zero")
+
+        if cost_kwp is None:
+            cost_kwp = self.cost_per_kwp
+
+        irradiation = sites['state'].map(self.irradiation).to_numpy(dtype=float)
+        installed_power = sites['available_area'].to_numpy(dtype=float) * self.panel_efficiency
+        monthly_generation = installed_power * self.monthly_yield(sites['state'].to_numpy())
+        self_sufficiency = np.minimum(100, monthly_generation / monthly_consumption * 100)
+        total_investment = installed_power * cost_kwp
+        monthly_savings = monthly_generation * self.energy_tariff
+        with np.errstate(divide='ignore', invalid='ignore'):
+            payback_years = np.where(monthly_savings > 0, total_investment / (monthly_savings * 12), np.inf)
+            roi_25_years = (monthly_savings * 12 * 25 - total_investment) / total_investment * 100
+
+        payback = payback_years.round(2)
+        self_sufficiency = self_sufficiency.round(2)
+        classification = np.select(
+            [(payback <= 4) & (self_sufficiency >= 50), (payback <= 6) & (self_sufficiency >= 30), payback <= 8],
+            ['ALTAMENTE VIÁVEL', 'VIÁVEL', 'MODERADAMENTE VIÁVEL'],
+            default='POUCO VIÁVEL'
+        )
+
+        return sites.assign(
+            irradiation=irradiation,
+            installed_power=installed_power.round(2),
+            monthly_generation=monthly_generation.round(2),
+            self_sufficiency=self_sufficiency,
+            total_investment=total_investment.round(2),
+            monthly_savings=monthly_savings.round(2),
+            payback_years=payback,
+            co2_reduction=(monthly_generation * 12 * self.co2_emission_factor / 1000).round(2),
+            roi_25_years=roi_25_years.round(2),
+            classification=classification
+        )
+
 if __name__ == "__main__":
     simulator = SolarSimulator()
     result = simulator.calculate_feasibility(5000, 'SP', 50)
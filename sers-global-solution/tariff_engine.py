@@ -0,0 +1,163 @@
+"""
+SERS Global Solution - Módulo de Tarifação Horo-Sazonal
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_analyzer import infer_interval_hours, month_segments
+
+
+class TariffEngine:
+    """
+    Classe para tarifação horo-sazonal (ponta / fora ponta) com cobrança de demanda
+    """
+
+    def __init__(self, peak_rate=1.95, offpeak_rate=0.62, peak_demand_rate=48.0,
+                 offpeak_demand_rate=18.0, peak_start=18, peak_duration=3,
+                 peak_on_weekends=False, contracted_demand_kw=None, compensate_surplus=True):
+        """
+        Inicializa o motor tarifário com uma estrutura típica de tarifa azul
+
+        Args:
+            peak_rate (float): Tarifa de energia na ponta (R$/kWh)
+            offpeak_rate (float): Tarifa de energia fora ponta (R$/kWh)
+            peak_demand_rate (float): Tarifa de demanda na ponta (R$/kW/mês)
+            offpeak_demand_rate (float): Tarifa de demanda fora ponta (R$/kW/mês)
+            peak_start (int): Hora de início do posto de ponta
+            peak_duration (int): Duração do posto de ponta em horas
+            peak_on_weekends (bool): Se o posto de ponta vale em sábados e domingos
+            contracted_demand_kw (float): Demanda contratada mínima faturada (opcional)
+            compensate_surplus (bool): Se a energia injetada gera créditos fora ponta
+        """
+        self.peak_rate = peak_rate
+        self.offpeak_rate = offpeak_rate
+        self.peak_demand_rate = peak_demand_rate
+        self.offpeak_demand_rate = offpeak_demand_rate
+        self.peak_start = peak_start
+        self.peak_duration = peak_duration
+        self.peak_on_weekends = peak_on_weekends
+        self.contracted_demand_kw = contracted_demand_kw
+        self.compensate_surplus = compensate_surplus
+
+    def peak_mask(self, timestamps):
+        """
+        Identifica os intervalos que pertencem ao posto de ponta
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo
+
+        Returns:
+            numpy.ndarray: Máscara booleana (True = ponta)
+        """
+        index = pd.DatetimeIndex(timestamps)
+        hour = index.hour.to_numpy()
+        mask = (hour >= self.peak_start) & (hour < self.peak_start + self.peak_duration)
+        if not self.peak_on_weekends:
+            mask &= index.weekday.to_numpy() < 5
+        return mask
+
+    def calculate_bill(self, timestamps, consumption):
+        """
+        Calcula a fatura mensal de uma ou várias unidades consumidoras
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo (comuns a todos os sites)
+            consumption (array-like): Energia por intervalo em kWh, vetor (intervalos)
+                ou matriz (sites x intervalos)
+
+        Returns:
+            dict: Arrays com os componentes da fatura por mês (última dimensão = meses)
+        """
+        index = pd.DatetimeIndex(timestamps)
+        consumption = np.asarray(consumption, dtype=float)
+        if len(index) == 0 or consumption.shape[-1] != len(index):
+            raise ValueError("Série de consumo incompatível com os instantes informados")
+
+        if not index.is_monotonic_increasing:
+            order = np.argsort(index.asi8, kind='stable')
+            index = index[order]
+            consumption = consumption[..., order]
+
+        interval_hours = infer_interval_hours(index)
+        peak = self.peak_mask(index)
+
+        # Meses são segmentos contíguos da série ordenada
+        months, starts = month_segments(index)
+
+        peak_energy = np.add.reduceat(np.where(peak, consumption, 0.0), starts, axis=-1)
+        offpeak_energy = np.add.reduceat(np.where(peak, 0.0, consumption), starts, axis=-1)
+
+        demand = consumption / interval_hours
+        peak_demand = np.maximum.reduceat(np.where(peak, demand, 0.0), starts, axis=-1)
+        offpeak_demand = np.maximum.reduceat(np.where(peak, 0.0, demand), starts, axis=-1)
+        if self.contracted_demand_kw is not None:
+            peak_demand = np.maximum(peak_demand, self.contracted_demand_kw)
+            offpeak_demand = np.maximum(offpeak_demand, self.contracted_demand_kw)
+
+        # Demanda é cobrada por mês cheio: meses parciais pagam a fração coberta
+        counts = np.diff(np.r_[starts, len(index)])
+        days_in_month = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(float)
+        coverage = np.minimum(counts * interval_hours / (days_in_month * 24), 1.0)
+
+        energy_cost = peak_energy * self.peak_rate + offpeak_energy * self.offpeak_rate
+        demand_cost = (peak_demand * self.peak_demand_rate
+                       + offpeak_demand * self.offpeak_demand_rate) * coverage
+
+        return {
+            'months': months,
+            'coverage': coverage,
+            'peak_energy_kwh': peak_energy,
+            'offpeak_energy_kwh': offpeak_energy,
+            'peak_demand_kw': peak_demand,
+            'offpeak_demand_kw': offpeak_demand,
+            'energy_cost': energy_cost,
+            'demand_cost': demand_cost,
+            'total_cost': energy_cost + demand_cost
+        }
+
+    def calculate_savings(self, timestamps, consumption, generation):
+        """
+        Calcula a economia mensal obtida ao abater a geração solar do consumo
+
+        Args:
+            timestamps (array-like): Instantes de início de cada intervalo
+            consumption (array-like): Consumo por intervalo em kWh (intervalos ou sites x intervalos)
+            generation (array-like): Geração solar por intervalo em kWh, mesmo formato do consumo
+                (ou vetor comum a todos os sites)
+
+        Returns:
+            dict: Faturas antes e depois da geração e economia por mês
+        """
+        consumption = np.asarray(consumption, dtype=float)
+        generation = np.broadcast_to(np.asarray(generation, dtype=float), consumption.shape)
+
+        net_load = np.maximum(consumption - generation, 0.0)
+        before = self.calculate_bill(timestamps, consumption)
+        after = self.calculate_bill(timestamps, net_load)
+
+        if self.compensate_surplus:
+            # Excedente injetado gera créditos de energia valorados fora ponta
+            surplus = np.maximum(generation - consumption, 0.0)
+            credits = self.calculate_bill(timestamps, surplus)
+            credit_value = (credits['peak_energy_kwh'] + credits['offpeak_energy_kwh']) * self.offpeak_rate
+            credit_value = np.minimum(credit_value, after['energy_cost'])
+            after['energy_cost'] = after['energy_cost'] - credit_value
+            after['total_cost'] = after['energy_cost'] + after['demand_cost']
+
+        return {
+            'months': before['months'],
+            'coverage': before['coverage'],
+            'cost_before': before['total_cost'],
+            'cost_after': after['total_cost'],
+            'savings': before['total_cost'] - after['total_cost']
+        }
+
+
+if __name__ == "__main__":
+    timestamps = pd.date_range('2025-01-01', periods=365 * 24, freq='h')
+    sites = np.random.default_rng(0).gamma(4.0, 12.0, size=(1000, len(timestamps)))
+
+    engine = TariffEngine()
+    bill = engine.calculate_bill(timestamps, sites)
+    print("Fatura anual média por site (R$):", round(bill['total_cost'].sum(axis=-1).mean(), 2))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Módulos da aplicação ficam no diretório pai, importados pelo nome
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
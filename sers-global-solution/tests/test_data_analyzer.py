@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from data_analyzer import EnergyAnalyzer
+
+
+def test_forecast_by_department_matches_recent_history():
+    analyzer = EnergyAnalyzer()
+    data = analyzer.generate_consumption_data(14, seed=0)
+
+    forecast = analyzer.forecast_consumption(data, horizon_days=7)
+
+    recent_daily = data['consumption_kwh'].tail(7 * 24).sum() / 7
+    assert forecast['consumption_kwh'].sum() / 7 == pytest.approx(recent_daily, rel=0.1)
+
+
+def test_compare_periods_accepts_timezone_aware_timestamps():
+    analyzer = EnergyAnalyzer()
+    data = analyzer.generate_consumption_data(30, seed=0)
+    aware = data.assign(timestamp=data['timestamp'].dt.tz_localize('America/Sao_Paulo'))
+
+    naive_result = analyzer.compare_periods(data, ('2025-01-01', '2025-01-15'), ('2025-01-15', '2025-01-31'))
+    aware_result = analyzer.compare_periods(aware, ('2025-01-01', '2025-01-15'), ('2025-01-15', '2025-01-31'))
+
+    assert aware_result['test'] == naive_result['test']
+
+
+def test_peak_hour_delta_is_a_clock_shift():
+    analyzer = EnergyAnalyzer()
+    data = analyzer.generate_consumption_data(30, seed=0)
+
+    deltas = analyzer.compare_periods(data, ('2025-01-01', '2025-01-15'), ('2025-01-15', '2025-01-31'))['deltas']
+    peak_hour = deltas.set_index('metric').loc['peak_hour']
+
+    assert peak_hour['delta'] == (peak_hour['after'] - peak_hour['before'] + 12) % 24 - 12
+    assert np.isnan(peak_hour['delta_pct'])
@@ -0,0 +1,15 @@
+import pytest
+
+from data_analyzer import EnergyAnalyzer
+
+
+def test_cleaning_generated_data_preserves_energy():
+    analyzer = EnergyAnalyzer()
+    data = analyzer.generate_consumption_data(30, seed=0)
+
+    cleaned = analyzer.clean_consumption_data(data)
+
+    assert len(cleaned) == len(data)
+    assert cleaned['consumption_kwh'].sum() == pytest.approx(data['consumption_kwh'].sum())
+    assert not cleaned['is_interpolated'].any()
+    assert (analyzer.quality_report['completeness_pct'] == 100).all()
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from data_analyzer import EnergyAnalyzer
+from live_feed import SlidingWindowAggregates
+
+
+def test_window_matches_batch_for_two_meters_at_15_minutes():
+    analyzer = EnergyAnalyzer()
+    data = pd.concat([analyzer.generate_consumption_data(3, seed=meter, freq='15min') for meter in range(2)])
+    data = data.sort_values('timestamp', kind='stable')
+
+    aggregates = SlidingWindowAggregates(window_hours=24, capacity=8)
+    for timestamp, consumption, department in zip(data['timestamp'], data['consumption_kwh'], data['department']):
+        aggregates.add(timestamp.to_pydatetime(), consumption, department)
+    live = aggregates.snapshot()
+
+    window = data[data['timestamp'] > data['timestamp'].max() - pd.Timedelta(hours=24)]
+    batch = analyzer.analyze_consumption_patterns(window)
+    assert live['window_readings'] == len(window)
+    assert live['total_consumption'] == pytest.approx(batch['total_consumption'])
+    assert live['peak_demand_kw'] == pytest.approx(batch['peak_demand_kw'])
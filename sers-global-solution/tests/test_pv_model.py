@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from pv_model import PVModel, STATE_CLIMATE, _typical_year
+from solar_simulator import SolarSimulator
+
+
+@pytest.fixture(scope='module')
+def irradiation():
+    return SolarSimulator().irradiation
+
+
+def test_clipping_loss_at_typical_oversizing_is_plausible(irradiation):
+    states = list(irradiation)
+    model = PVModel()
+
+    clipping = {ratio: model.annual_summary([irradiation[state] for state in states], states, ratio)[
+        'clipping_loss_pct'].to_numpy() for ratio in (1.1, 1.3, 1.5)}
+
+    assert ((clipping[1.3] > 1) & (clipping[1.3] < 3)).all()
+    assert (clipping[1.1] < clipping[1.3]).all() and (clipping[1.3] < clipping[1.5]).all()
+
+
+def test_clear_days_reach_full_sun_and_annual_irradiation_is_preserved(irradiation):
+    model = PVModel()
+    states = ['SP', 'CE']
+    year = _typical_year()
+
+    features = model._interval_features(year)
+    climate = np.array([list(STATE_CLIMATE).index(state) for state in states], dtype=float)
+    daily = np.array([irradiation[state] for state in states])
+    _, _, _, irradiance = model._power(daily, climate, np.array([1.25, 1.25]), features)
+
+    assert irradiance.max(axis=1) == pytest.approx([1000, 1000], abs=120)
+    assert irradiance.sum(axis=1) / 1000 / 365 == pytest.approx(daily, rel=0.01)
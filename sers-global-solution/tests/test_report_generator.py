@@ -0,0 +1,27 @@
+import os
+
+from report_generator import ReportGenerator, PLOTLY_BATCH_FILE, plotly_bundle
+
+
+def _sites(count):
+    return [{'site_id': f'site_{i}', 'days': 2, 'state': 'SP', 'available_area': 50, 'seed': i}
+            for i in range(count)]
+
+
+def test_batch_html_shares_one_plotly_copy(tmp_path):
+    generator = ReportGenerator(str(tmp_path), max_workers=2)
+    paths = generator.generate_batch(_sites(3))
+
+    bundle_path = tmp_path / PLOTLY_BATCH_FILE
+    assert bundle_path.read_text(encoding='utf-8') == plotly_bundle()
+    for path in paths:
+        content = open(path, encoding='utf-8').read()
+        assert f'<script src="{PLOTLY_BATCH_FILE}"></script>' in content
+        assert os.path.getsize(path) < len(plotly_bundle()) / 10
+
+
+def test_single_report_embeds_plotly(tmp_path):
+    path = ReportGenerator(str(tmp_path)).generate_report(_sites(1)[0])
+
+    assert plotly_bundle() in open(path, encoding='utf-8').read()
+    assert not (tmp_path / PLOTLY_BATCH_FILE).exists()
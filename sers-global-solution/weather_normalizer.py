@@ -0,0 +1,260 @@
+"""
+SERS Global Solution - Módulo de Normalização Climática do Consumo
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_analyzer import EnergyAnalyzer
+
+
+class WeatherNormalizer:
+    """
+    Classe para normalização climática do consumo por regressão em graus-hora de resfriamento
+    """
+
+    def __init__(self, base_temperature=24.0, analyzer=None, min_coverage=0.75):
+        """
+        Inicializa o normalizador
+
+        Args:
+            base_temperature (float): Temperatura base (°C) acima da qual há carga de climatização
+            analyzer (EnergyAnalyzer): Analisador usado para agregar o consumo (opcional)
+            min_coverage (float): Fração mínima das leituras de temperatura de um dia para
+                que seus graus-hora sejam estimados; dias com menos leituras ficam sem valor
+        """
+        if not 0 < min_coverage <= 1:
+            raise ValueError("Cobertura mínima deve estar entre 0 e 1")
+
+        self.base_temperature = base_temperature
+        self.min_coverage = min_coverage
+        self.analyzer = analyzer or EnergyAnalyzer()
+        self.coefficients = None
+
+    @staticmethod
+    def load_temperature(path):
+        """
+        Carrega uma série horária de temperatura de um arquivo CSV local
+
+        O arquivo deve ter a coluna 'timestamp' e uma coluna 'temperature_c' (série
+        única) ou uma coluna de temperatura por medidor.
+
+        Args:
+            path (str): Caminho do arquivo CSV
+
+        Returns:
+            pandas.Series ou pandas.DataFrame: Temperatura (°C) indexada pelo instante
+        """
+        temperature = pd.read_csv(path, parse_dates=['timestamp']).set_index('timestamp').sort_index()
+        if temperature.empty:
+            raise ValueError("Arquivo de temperatura vazio")
+        if list(temperature.columns) == ['temperature_c']:
+            return temperature['temperature_c']
+        return temperature
+
+    def daily_cooling_degree_hours(self, temperature):
+        """
+        Calcula os graus-hora de resfriamento acumulados em cada dia
+
+        Dias com leituras faltantes têm a soma extrapolada pela fração do dia
+        coberta; dias abaixo da cobertura mínima ficam como NaN e são
+        desconsiderados no ajuste, em vez de entrarem como dias sem calor.
+
+        Args:
+            temperature (pandas.Series ou pandas.DataFrame): Temperatura horária (°C)
+
+        Returns:
+            pandas.Series ou pandas.DataFrame: Graus-hora de resfriamento por dia
+        """
+        interval_hours = pd.Series(temperature.index).diff().median() / pd.Timedelta(hours=1)
+        if np.isnan(interval_hours):
+            interval_hours = 1.0
+        cooling = (temperature - self.base_temperature).clip(lower=0) * interval_hours
+        daily = cooling.resample('D')
+        coverage = daily.count() * interval_hours / 24
+        return (daily.sum() / coverage).where(coverage >= self.min_coverage)
+
+    def fit(self, daily_consumption, daily_cdh):
+        """
+        Ajusta, para todos os medidores em uma única chamada, o modelo
+        consumo diário = carga base + efeito fim de semana + inclinação x graus-hora
+
+        Args:
+            daily_consumption (pandas.DataFrame): Consumo diário (dias x medidores)
+            daily_cdh (pandas.Series ou pandas.DataFrame): Graus-hora diários, comuns a
+                todos os medidores ou um por medidor
+
+        Returns:
+            pandas.DataFrame: Coeficientes por medidor ('base_load_kwh', 'weekend_kwh',
+                'cooling_kwh_per_degree_hour', 'r2')
+        """
+        targets, design, valid = self._aligned_design(daily_consumption, daily_cdh)
+
+        # Equações normais empilhadas (medidores x 3 x 3) resolvidas em lote
+        gram = np.einsum('mdk,mdl->mkl', design, design) + 1e-9 * np.eye(design.shape[-1])
+        moment = np.einsum('mdk,md->mk', design, targets)
+        beta = np.linalg.solve(gram, moment[..., None])[..., 0]
+
+        fitted = np.einsum('mdk,mk->md', design, beta)
+        counts = valid.sum(axis=1)
+        means = targets.sum(axis=1) / np.maximum(counts, 1)
+        total = (np.where(valid, targets - means[:, None], 0.0) ** 2).sum(axis=1)
+        residual = (np.where(valid, targets - fitted, 0.0) ** 2).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r2 = np.where(total > 0, 1 - residual / total, np.nan)
+
+        self.coefficients = pd.DataFrame({
+            'base_load_kwh': beta[:, 0],
+            'weekend_kwh': beta[:, 1],
+            'cooling_kwh_per_degree_hour': beta[:, 2],
+            'r2': r2
+        }, index=daily_consumption.columns)
+        return self.coefficients
+
+    def normalize(self, df, temperature, meter_col=None, normal_cdh=None):
+        """
+        Calcula o consumo diário ajustado para condições climáticas normais
+
+        Args:
+            df (pandas.DataFrame): DataFrame com 'timestamp' e 'consumption_kwh'
+            temperature (pandas.Series ou pandas.DataFrame): Temperatura horária (°C)
+            meter_col (str): Coluna que identifica o medidor (opcional)
+            normal_cdh (float): Graus-hora diários de referência (padrão: média da série
+                de temperatura)
+
+        Returns:
+            pandas.DataFrame: Por dia e medidor, consumo real, graus-hora, parcela
+                climática e consumo ajustado
+        """
+        daily_consumption = self._daily_consumption(df, meter_col)
+        daily_cdh = self.daily_cooling_degree_hours(temperature)
+        coefficients = self.fit(daily_consumption, daily_cdh)
+
+        if normal_cdh is None:
+            normal_cdh = np.nanmean(daily_cdh.to_numpy(dtype=float))
+
+        cdh = self._cdh_matrix(daily_consumption, daily_cdh)
+        slope = coefficients['cooling_kwh_per_degree_hour'].to_numpy()
+        actual = daily_consumption.to_numpy(dtype=float)
+        adjusted = actual - slope * (cdh - normal_cdh)
+
+        n_days, n_meters = actual.shape
+        return pd.DataFrame({
+            'date': np.repeat(daily_consumption.index.to_numpy(), n_meters),
+            'meter': np.tile(daily_consumption.columns.to_numpy(), n_days),
+            'actual_kwh': actual.ravel().round(2),
+            'cooling_degree_hours': cdh.ravel().round(2),
+            'weather_kwh': (slope * cdh).ravel().round(2),
+            'adjusted_kwh': adjusted.ravel().round(2)
+        })
+
+    def calculate_savings(self, df, temperature, reporting_start, meter_col=None):
+        """
+        Calcula a economia ajustada ao clima: o modelo do período base prevê o
+        consumo do período de apuração sob as temperaturas reais deste período
+
+        Args:
+            df (pandas.DataFrame): DataFrame com 'timestamp' e 'consumption_kwh'
+            temperature (pandas.Series ou pandas.DataFrame): Temperatura horária (°C)
+            reporting_start (str): Início do período de apuração (após a medida)
+            meter_col (str): Coluna que identifica o medidor (opcional)
+
+        Returns:
+            pandas.DataFrame: Por medidor, consumo previsto (linha de base ajustada),
+                consumo real, economia em kWh e em %
+        """
+        daily_consumption = self._daily_consumption(df, meter_col)
+        daily_cdh = self.daily_cooling_degree_hours(temperature)
+
+        reporting = daily_consumption.index >= pd.Timestamp(reporting_start)
+        if reporting.all() or not reporting.any():
+            raise ValueError("Período base e período de apuração devem conter dados")
+
+        coefficients = self.fit(daily_consumption[~reporting], daily_cdh)
+        targets, design, valid = self._aligned_design(daily_consumption[reporting], daily_cdh)
+        beta = coefficients[['base_load_kwh', 'weekend_kwh', 'cooling_kwh_per_degree_hour']].to_numpy()
+
+        predicted = np.where(valid, np.einsum('mdk,mk->md', design, beta), 0.0).sum(axis=1)
+        actual = targets.sum(axis=1)
+
+        savings = pd.DataFrame({
+            'baseline_kwh': predicted.round(2),
+            'actual_kwh': actual.round(2),
+            'savings_kwh': (predicted - actual).round(2)
+        }, index=daily_consumption.columns)
+        savings['savings_pct'] = (savings['savings_kwh'] / savings['baseline_kwh'] * 100).round(2)
+        return savings
+
+    def _daily_consumption(self, df, meter_col):
+        """Consumo diário como matriz dias x medidores"""
+        if meter_col is None:
+            return self.analyzer.resample_consumption(df, 'D').to_frame('total')
+        return self.analyzer.resample_consumption(df, 'D', meter_col=meter_col)
+
+    @staticmethod
+    def _cdh_matrix(daily_consumption, daily_cdh):
+        """Graus-hora diários alinhados à matriz de consumo (dias x medidores)"""
+        aligned = daily_cdh.reindex(daily_consumption.index)
+        if isinstance(aligned, pd.Series):
+            return np.repeat(aligned.to_numpy(dtype=float)[:, None], daily_consumption.shape[1], axis=1)
+        missing = set(daily_consumption.columns) - set(aligned.columns)
+        if missing:
+            raise ValueError(f"Temperatura não encontrada para os medidores: {sorted(missing)}")
+        return aligned[daily_consumption.columns].to_numpy(dtype=float)
+
+    def _aligned_design(self, daily_consumption, daily_cdh):
+        """Alvos (medidores x dias), regressão (medidores x dias x 3) e máscara dos dias válidos, os demais zerados"""
+        cdh = self._cdh_matrix(daily_consumption, daily_cdh).T
+        targets = daily_consumption.to_numpy(dtype=float).T
+        valid = ~np.isnan(targets) & ~np.isnan(cdh)
+
+        weekend = (daily_consumption.index.weekday >= 5).astype(float)
+        design = np.stack([np.ones_like(cdh), np.broadcast_to(weekend, cdh.shape), cdh], axis=-1)
+        return np.where(valid, targets, 0.0), np.where(valid[..., None], design, 0.0), valid
+
+
+def synthetic_temperature(start='2025-01-01', days=365, mean=26.0, seasonal_amplitude=3.0,
+                          daily_amplitude=5.0, seed=None):
+    """
+    Gera uma série horária de temperatura típica de escritórios brasileiros (para testes)
+
+    Args:
+        start (str): Instante inicial
+        days (int): Número de dias
+        mean (float): Temperatura média (°C)
+        seasonal_amplitude (float): Amplitude da variação anual (°C)
+        daily_amplitude (float): Amplitude da variação diária (°C)
+        seed (int): Semente aleatória (opcional)
+
+    Returns:
+        pandas.Series: Temperatura horária (°C)
+    """
+    index = pd.date_range(start, periods=days * 24, freq='h')
+    rng = np.random.default_rng(seed)
+    seasonal = seasonal_amplitude * np.cos(2 * np.pi * (index.dayofyear.to_numpy() - 15) / 365.25)
+    diurnal = daily_amplitude * np.cos(2 * np.pi * (index.hour.to_numpy() - 15) / 24)
+    return pd.Series(mean + seasonal + diurnal + rng.normal(0, 1, len(index)), index=index,
+                     name='temperature_c')
+
+
+if __name__ == "__main__":
+    import time
+
+    temperature = synthetic_temperature(seed=0)
+    analyzer = EnergyAnalyzer()
+    data = analyzer.generate_consumption_data(365, seed=0)
+
+    # Carga de climatização proporcional aos graus-hora, com intensidade distinta por prédio
+    cooling = (temperature.to_numpy() - 24).clip(min=0)
+    buildings = pd.concat([
+        data.assign(meter=f'predio_{i:03d}',
+                    consumption_kwh=data['consumption_kwh'].to_numpy() + (1 + i % 5) * cooling)
+        for i in range(300)
+    ], ignore_index=True)
+
+    normalizer = WeatherNormalizer()
+    start = time.perf_counter()
+    result = normalizer.normalize(buildings, temperature, meter_col='meter')
+    elapsed = time.perf_counter() - start
+    print(f"{buildings['meter'].nunique()} prédios normalizados em {elapsed:.2f}s")
+    print(normalizer.coefficients.head())